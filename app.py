@@ -3,7 +3,8 @@ import json
 import datetime
 from pathlib import Path
 import pandas as pd
-from utils.data_manager import DataManager
+from utils.data_manager import SaveConflictError
+from utils.state_cache import get_state_cache
 from utils.parking_logic import ParkingLogic
 # Add this improved error handling at the top of your server.py
 import logging
@@ -1085,11 +1086,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize data manager
-@st.cache_resource
-def init_data_manager():
-    return DataManager()
-
 @st.cache_resource
 def init_parking_logic():
     return ParkingLogic()
@@ -1109,9 +1105,10 @@ def main():
     if 'theme' not in st.session_state:
         st.session_state.theme = 'dark'
     
-    if 'parking_data' not in st.session_state:
-        data_manager = init_data_manager()
-        st.session_state.parking_data = data_manager.load_parking_data()
+    # Start from, and follow, the process-wide saved state
+    state_cache = get_state_cache()
+    if 'parking_data' not in st.session_state or st.session_state.get('parking_version') != state_cache.version:
+        st.session_state.parking_data, st.session_state.parking_version = state_cache.mutable_copy()
     
     if 'selected_slot' not in st.session_state:
         st.session_state.selected_slot = None
@@ -1219,7 +1216,7 @@ def show_parking_grid():
             slot_data = st.session_state.parking_data[slot_num - 1]
             
             with col:
-                if slot_data['vehicleType'] is None and not slot_data['isReserved']:
+                if slot_data.is_available:
                     # Available slot
                     if st.button(f"🟢 Slot {slot_num}\nAvailable", 
                                key=f"slot_{slot_num}",
@@ -1227,17 +1224,17 @@ def show_parking_grid():
                         st.session_state.selected_slot = slot_num
                         st.rerun()
                 
-                elif slot_data['isReserved']:
+                elif slot_data.is_reserved:
                     # Reserved slot
-                    reservation = slot_data['reservationData']
-                    if st.button(f"🟡 Slot {slot_num}\nReserved\n{reservation['vehicleType']}", 
+                    reservation = slot_data.reservation
+                    if st.button(f"🟡 Slot {slot_num}\nReserved\n{reservation.vehicle_type.label}", 
                                key=f"slot_{slot_num}",
-                               help=f"Reserved for {reservation['customerName']}"):
+                               help=f"Reserved for {reservation.customer_name}"):
                         show_reservation_details(slot_data)
                 
                 else:
                     # Occupied slot
-                    if st.button(f"🔴 Slot {slot_num}\nOccupied\n{slot_data['vehicleType']}\n{slot_data['vehicleNumber']}", 
+                    if st.button(f"🔴 Slot {slot_num}\nOccupied\n{slot_data.vehicle_label}\n{slot_data.vehicle_number}", 
                                key=f"slot_{slot_num}",
                                help="Click to remove vehicle or view details"):
                         show_vehicle_details(slot_data)
@@ -1297,11 +1294,10 @@ def show_control_panel():
                     duration
                 )
                 
-                if result['success']:
+                if result['success'] and save_parking_state(result['data']):
                     st.success(f"Vehicle parked in slot {result['slot']}!")
-                    st.session_state.parking_data = result['data']
                     st.rerun()
-                else:
+                elif not result['success']:
                     st.error(result['message'])
             else:
                 st.error("Please enter vehicle number")
@@ -1328,28 +1324,42 @@ def show_control_panel():
             st.switch_page("pages/03_📅_Holiday_Calendar.py")
 
 def show_vehicle_details(slot_data):
-    with st.expander(f"Vehicle Details - Slot {slot_data['slot']}", expanded=True):
-        st.write(f"**Vehicle Type:** {slot_data['vehicleType']}")
-        st.write(f"**Vehicle Number:** {slot_data['vehicleNumber']}")
-        st.write(f"**Arrival:** {slot_data['arrivalDate']} at {slot_data['arrivalTime']}")
-        st.write(f"**Expected Departure:** {slot_data['expectedPickupDate']} at {slot_data['expectedPickupTime']}")
-        st.write(f"**Current Charge:** ₹{slot_data['charge']}")
+    with st.expander(f"Vehicle Details - Slot {slot_data.slot}", expanded=True):
+        st.write(f"**Vehicle Type:** {slot_data.vehicle_label}")
+        st.write(f"**Vehicle Number:** {slot_data.vehicle_number}")
+        st.write(f"**Arrival:** {slot_data.arrival_date} at {slot_data.arrival_time}")
+        st.write(f"**Expected Departure:** {slot_data.pickup_date} at {slot_data.pickup_time}")
+        st.write(f"**Current Charge:** ₹{slot_data.charge_rupees}")
         
-        if st.button(f"🚗 Remove Vehicle from Slot {slot_data['slot']}", key=f"remove_{slot_data['slot']}"):
-            remove_vehicle(slot_data['slot'])
+        if st.button(f"🚗 Remove Vehicle from Slot {slot_data.slot}", key=f"remove_{slot_data.slot}"):
+            remove_vehicle(slot_data.slot)
+
+def save_parking_state(data):
+    """Save the session's edited slots, merged with other sessions' changes"""
+    state_cache = get_state_cache()
+    try:
+        st.session_state.parking_version = state_cache.save(
+            data, base_version=st.session_state.get('parking_version')
+        )
+        st.session_state.parking_data = data
+        return True
+    except SaveConflictError as e:
+        st.error(f"Could not save: {e}")
+        st.session_state.parking_data, st.session_state.parking_version = state_cache.mutable_copy()
+        return False
 
 def remove_vehicle(slot_num):
     parking_logic = init_parking_logic()
     result = parking_logic.remove_vehicle(st.session_state.parking_data, slot_num)
     
-    if result['success']:
+    if result['success'] and save_parking_state(result['data']):
+        get_state_cache().data_manager.record_stay(result['bill'])
         st.success(f"Vehicle removed from slot {slot_num}")
-        st.session_state.parking_data = result['data']
         
         # Show bill
         show_bill(result['bill'])
         st.rerun()
-    else:
+    elif not result['success']:
         st.error(result['message'])
 
 def show_bill(bill_data):
@@ -1405,12 +1415,12 @@ def show_search_dialog():
     if search_term:
         results = []
         for slot_data in st.session_state.parking_data:
-            if slot_data['vehicleNumber'] and search_term.upper() in slot_data['vehicleNumber'].upper():
+            if slot_data.vehicle_number and search_term.upper() in slot_data.vehicle_number.upper():
                 results.append(slot_data)
         
         if results:
             for result in results:
-                st.success(f"Found in Slot {result['slot']}: {result['vehicleType']} - {result['vehicleNumber']}")
+                st.success(f"Found in Slot {result.slot}: {result.vehicle_type.label} - {result.vehicle_number}")
         else:
             st.warning("Vehicle not found")
 
@@ -1443,24 +1453,23 @@ def show_reservation_dialog():
                     duration
                 )
                 
-                if result['success']:
+                if result['success'] and save_parking_state(result['data']):
                     st.success(f"Slot {result['slot']} reserved successfully!")
-                    st.session_state.parking_data = result['data']
                     st.rerun()
-                else:
+                elif not result['success']:
                     st.error(result['message'])
             else:
                 st.error("Please fill all required fields")
 
 def show_reservation_details(slot_data):
-    reservation = slot_data['reservationData']
+    reservation = slot_data.reservation
     st.info(f"""
-    **Reserved Slot {slot_data['slot']}**
+    **Reserved Slot {slot_data.slot}**
     
-    Customer: {reservation['customerName']}
-    Vehicle: {reservation['vehicleType']} - {reservation['vehicleNumber']}
-    Expected Arrival: {reservation['date']} at {reservation['time']}
-    Duration: {reservation['duration']} hours
+    Customer: {reservation.customer_name}
+    Vehicle: {reservation.vehicle_type.label} - {reservation.vehicle_number}
+    Expected Arrival: {reservation.date} at {reservation.time}
+    Duration: {reservation.duration} hours
     """)
 
 if __name__ == "__main__":
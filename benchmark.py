@@ -0,0 +1,202 @@
+"""Offline benchmarks for the detection server.
+
+Usage:
+    python benchmark.py ocr <plate_image_dir> [--backends ocrspace,tesseract,replay]
+    python benchmark.py detection <recording> [<recording> ...] [--phase all|vehicle|plate|gesture] [--realtime]
+        [--confirm-frames N] [--confirm-confidence C] [--gesture-confirm-frames N]
+    python benchmark.py models <recording> [--model vehicle|plate] [--backends pytorch,onnx,openvino]
+
+A recording is a video file or a directory of JPEG frames covering one vehicle.
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import cv2
+
+import server
+from utils.camera import parse_camera_source, open_frame_source
+from utils.model_export import load_model
+from utils.sessions import DetectionSession
+from utils.ocr_backends import create_ocr_backend
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+def load_images(directory):
+    """Load every image in a directory, sorted by file name"""
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    return [(p.name, cv2.imread(str(p))) for p in paths]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_latency_summary(label, latencies):
+    if not latencies:
+        print(f"{label}: no samples")
+        return
+    print(f"{label}: n={len(latencies)} "
+          f"mean={statistics.mean(latencies) * 1000:.1f}ms "
+          f"p50={percentile(latencies, 50) * 1000:.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:.1f}ms")
+
+
+def benchmark_ocr(args):
+    """Run process_license_plate_ocr() over recorded plate crops with each backend"""
+    images = load_images(args.images)
+    if not images:
+        print(f"No images found in {args.images}")
+        return
+
+    for backend_name in args.backends.split(','):
+        backend = create_ocr_backend(
+            backend_name,
+            api_key=server.OCR_API_KEY,
+            api_url=server.OCR_API_URL,
+            replay_dir=args.replay_dir,
+            record_dir=args.record_dir
+        )
+        latencies = []
+        recognized = 0
+        for name, image in images:
+            start = time.perf_counter()
+            results = server.process_license_plate_ocr(image, backend=backend, use_cache=False)
+            latencies.append(time.perf_counter() - start)
+            if results:
+                recognized += 1
+            if args.verbose:
+                print(f"  {backend_name} {name}: {results[0][0] if results else '-'}")
+        print_latency_summary(f"{backend_name} ({recognized}/{len(images)} plates read)", latencies)
+
+
+PHASES = {
+    'vehicle': 'vehicle_detection_phase',
+    'plate': 'license_plate_detection_phase',
+    'gesture': 'hand_gesture_detection_phase'
+}
+
+
+def benchmark_detection(args):
+    """Replay recordings through the detection phases and report throughput and latency"""
+    server.HEADLESS = True
+    server.camera_manager.realtime = args.realtime
+    if args.confirm_frames is not None:
+        server.CONFIRM_FRAMES = args.confirm_frames
+    if args.confirm_confidence is not None:
+        server.CONFIRM_CONFIDENCE = args.confirm_confidence
+    if args.gesture_confirm_frames is not None:
+        server.GESTURE_CONFIRM_FRAMES = args.gesture_confirm_frames
+    print(f"Confirmation: {server.CONFIRM_FRAMES} inferences or confidence >= {server.CONFIRM_CONFIDENCE}, "
+          f"{server.GESTURE_CONFIRM_FRAMES} gesture frames")
+
+    vehicle_times = []
+    for recording in args.recordings:
+        source = parse_camera_source(recording)
+        for timings in server.frame_timings.values():
+            timings.clear()
+
+        session = DetectionSession(source)
+        start = time.perf_counter()
+        if args.phase == 'all':
+            server.run_detection(session)
+        else:
+            getattr(server, PHASES[args.phase])(session)
+        result = session.results
+        elapsed = time.perf_counter() - start
+        vehicle_times.append(elapsed)
+
+        print(f"{recording}: {elapsed:.2f}s end-to-end, result={result}")
+        for phase, timings in server.frame_timings.items():
+            latencies = list(timings)
+            if not latencies:
+                continue
+            fps = len(latencies) / sum(latencies) if sum(latencies) else 0
+            # Frames a phase needed before it confirmed and handed off to the next one
+            print_latency_summary(f"  {phase} ({fps:.1f} FPS, {len(latencies)} frames to confirm)", latencies)
+
+    if len(vehicle_times) > 1:
+        print_latency_summary("End-to-end per vehicle", vehicle_times)
+    print(f"Gate throughput: {60 / statistics.mean(vehicle_times):.1f} vehicles/min")
+
+
+def benchmark_models(args):
+    """Compare raw model inference speed of each backend on the frames of a recording"""
+    source = open_frame_source(parse_camera_source(args.recording), realtime=False)
+    frames = []
+    while len(frames) < args.frames:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+    source.release()
+    if not frames:
+        print(f"No frames read from {args.recording}")
+        return
+
+    weights_path = server.VEHICLE_MODEL_PATH if args.model == 'vehicle' else server.YOLO_MODEL_PATH
+    for backend in args.backends.split(','):
+        try:
+            model = load_model(weights_path, backend, threads=server.INFERENCE_THREADS)
+        except Exception as e:
+            print(f"{backend}: could not load model ({e})")
+            continue
+
+        model(frames[0], verbose=False)  # Warm-up
+        latencies = []
+        for frame in frames:
+            start = time.perf_counter()
+            model(frame, verbose=False)
+            latencies.append(time.perf_counter() - start)
+        print_latency_summary(f"{backend} ({len(latencies) / sum(latencies):.1f} FPS)", latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart Parking detection benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ocr_parser = subparsers.add_parser('ocr', help="Benchmark OCR backends on plate crops")
+    ocr_parser.add_argument('images', help="Directory of cropped license plate images")
+    ocr_parser.add_argument('--backends', default=server.OCR_BACKEND,
+                            help="Comma separated list of backends: ocrspace, tesseract, replay")
+    ocr_parser.add_argument('--replay-dir', default=server.OCR_REPLAY_DIR,
+                            help="Directory of recorded responses for the replay backend")
+    ocr_parser.add_argument('--record-dir', default=None,
+                            help="Record live responses here so they can be replayed later")
+    ocr_parser.add_argument('--verbose', action='store_true')
+    ocr_parser.set_defaults(func=benchmark_ocr)
+
+    detection_parser = subparsers.add_parser('detection', help="Benchmark detection phases on recordings")
+    detection_parser.add_argument('recordings', nargs='+', help="Video files or image directories, one per vehicle")
+    detection_parser.add_argument('--phase', choices=['all'] + list(PHASES), default='all',
+                                  help="Run the full pipeline or a single phase")
+    detection_parser.add_argument('--realtime', action='store_true',
+                                  help="Replay at the recording's frame rate instead of as fast as possible")
+    detection_parser.add_argument('--confirm-frames', type=int,
+                                  help="Consecutive agreeing inferences to confirm a vehicle or plate")
+    detection_parser.add_argument('--confirm-confidence', type=float,
+                                  help="Confidence that confirms a vehicle or plate on a single inference")
+    detection_parser.add_argument('--gesture-confirm-frames', type=int,
+                                  help="Consecutive frames showing the same finger count")
+    detection_parser.set_defaults(func=benchmark_detection)
+
+    models_parser = subparsers.add_parser('models', help="Compare inference backends on recorded frames")
+    models_parser.add_argument('recording', help="Video file or image directory")
+    models_parser.add_argument('--model', choices=['vehicle', 'plate'], default='vehicle')
+    models_parser.add_argument('--backends', default='pytorch,onnx,openvino',
+                               help="Comma separated list of backends: pytorch, onnx, openvino")
+    models_parser.add_argument('--frames', type=int, default=200, help="Maximum number of frames to run")
+    models_parser.set_defaults(func=benchmark_models)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Import the JSON parking data into the SQLite storage.
+
+Usage:
+    python migrate_storage.py [--data-dir data] [--force]
+
+Reads data/parking_data.json (plus data/parking_journal.log when the journal
+storage was used) and data/holidays.json, and writes them to data/parking.db.
+Run the app with PARKING_STORAGE=sqlite afterwards.
+"""
+import argparse
+import json
+from pathlib import Path
+
+from utils.journal import ParkingJournal
+from utils.sqlite_store import SQLiteStore
+
+
+def load_json_slots(data_dir):
+    parking_file = data_dir / "parking_data.json"
+    if not parking_file.exists():
+        return []
+    with open(parking_file, 'r') as f:
+        slots = {slot['slot']: slot for slot in json.load(f)}
+    # Changes logged since the last snapshot
+    for record in ParkingJournal(data_dir / "parking_journal.log").replay():
+        slots[record['slot']] = record['data']
+    return [slots[number] for number in sorted(slots)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON parking data into SQLite")
+    parser.add_argument('--data-dir', default='data', type=Path)
+    parser.add_argument('--force', action='store_true', help="Replace the slots already in the database")
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.data_dir / "parking.db")
+    if store.load_slots() and not args.force:
+        print(f"{args.data_dir / 'parking.db'} already has slots, pass --force to overwrite them")
+        return
+
+    slots = load_json_slots(args.data_dir)
+    # Replaced outright, the stays history is left as it is
+    store.replace_slots(slots)
+    print(f"Imported {len(slots)} slots")
+
+    holidays_file = args.data_dir / "holidays.json"
+    if holidays_file.exists():
+        with open(holidays_file, 'r') as f:
+            holidays = json.load(f)
+        store.save_holidays(holidays)
+        print(f"Imported {len(holidays)} holidays")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
 
+from utils.state_cache import get_state_cache
+
 st.set_page_config(
     page_title="Reports - Vehicle Vacancy Vault",
     page_icon="📊",
@@ -15,31 +17,26 @@ def main():
     st.title("📊 Parking Reports & Analytics")
     st.markdown("*Comprehensive parking statistics and insights*")
     
-    # Load parking data
-    if 'parking_data' not in st.session_state:
-        from utils.data_manager import DataManager
-        data_manager = DataManager()
-        st.session_state.parking_data = data_manager.load_parking_data()
+    # Report on the shared saved state, not this session's copy
+    parking_data, _ = get_state_cache().view()
     
     # Generate reports
-    show_summary_stats()
-    show_occupancy_charts()
-    show_revenue_analysis()
-    show_vehicle_type_breakdown()
-    show_detailed_table()
+    show_summary_stats(parking_data)
+    show_occupancy_charts(parking_data)
+    show_revenue_analysis(parking_data)
+    show_vehicle_type_breakdown(parking_data)
+    show_detailed_table(parking_data)
 
-def show_summary_stats():
+def show_summary_stats(parking_data):
     """Display summary statistics"""
     st.markdown("### 📈 Summary Statistics")
     
-    parking_data = st.session_state.parking_data
-    
     # Calculate stats
     total_slots = len(parking_data)
-    available = sum(1 for slot in parking_data if slot['vehicleType'] is None and not slot['isReserved'])
-    occupied = sum(1 for slot in parking_data if slot['vehicleType'] is not None)
-    reserved = sum(1 for slot in parking_data if slot['isReserved'])
-    total_revenue = sum(slot['charge'] for slot in parking_data if slot['charge'])
+    available = sum(1 for slot in parking_data if slot.is_available)
+    occupied = sum(1 for slot in parking_data if slot.is_occupied)
+    reserved = sum(1 for slot in parking_data if slot.is_reserved)
+    total_revenue = sum(slot.charge for slot in parking_data) / 100
     
     # Occupancy rate
     occupancy_rate = (occupied / total_slots) * 100 if total_slots > 0 else 0
@@ -84,20 +81,18 @@ def show_summary_stats():
         daily_projection = total_revenue * 3  # Assuming 3 turnovers per day
         st.metric("Daily Projection", f"₹{daily_projection:.2f}")
 
-def show_occupancy_charts():
+def show_occupancy_charts(parking_data):
     """Display occupancy charts"""
     st.markdown("### 📊 Occupancy Analysis")
     
-    parking_data = st.session_state.parking_data
-    
     col1, col2 = st.columns(2)
     
     with col1:
         # Pie chart for slot status
         status_counts = {
-            'Available': sum(1 for slot in parking_data if slot['vehicleType'] is None and not slot['isReserved']),
-            'Occupied': sum(1 for slot in parking_data if slot['vehicleType'] is not None),
-            'Reserved': sum(1 for slot in parking_data if slot['isReserved'])
+            'Available': sum(1 for slot in parking_data if slot.is_available),
+            'Occupied': sum(1 for slot in parking_data if slot.is_occupied),
+            'Reserved': sum(1 for slot in parking_data if slot.is_reserved)
         }
         
         fig_pie = px.pie(
@@ -115,13 +110,13 @@ def show_occupancy_charts():
     
     with col2:
         # Bar chart for slot occupancy
-        slot_numbers = [slot['slot'] for slot in parking_data]
+        slot_numbers = [slot.slot for slot in parking_data]
         slot_status = []
         
         for slot in parking_data:
-            if slot['vehicleType'] is not None:
+            if slot.is_occupied:
                 slot_status.append('Occupied')
-            elif slot['isReserved']:
+            elif slot.is_reserved:
                 slot_status.append('Reserved')
             else:
                 slot_status.append('Available')
@@ -141,12 +136,11 @@ def show_occupancy_charts():
         fig_bar.update_layout(showlegend=True, yaxis_title="Occupancy")
         st.plotly_chart(fig_bar, use_container_width=True)
 
-def show_revenue_analysis():
+def show_revenue_analysis(parking_data):
     """Display revenue analysis"""
     st.markdown("### 💰 Revenue Analysis")
     
-    parking_data = st.session_state.parking_data
-    occupied_slots = [slot for slot in parking_data if slot['vehicleType'] is not None]
+    occupied_slots = [slot for slot in parking_data if slot.is_occupied]
     
     if not occupied_slots:
         st.info("No occupied slots available for revenue analysis")
@@ -158,10 +152,10 @@ def show_revenue_analysis():
         # Revenue by vehicle type
         vehicle_revenue = {}
         for slot in occupied_slots:
-            vehicle_type = slot['vehicleType']
+            vehicle_type = slot.vehicle_type.label
             if vehicle_type not in vehicle_revenue:
                 vehicle_revenue[vehicle_type] = 0
-            vehicle_revenue[vehicle_type] += slot['charge']
+            vehicle_revenue[vehicle_type] += slot.charge / 100
         
         fig_revenue = px.bar(
             x=list(vehicle_revenue.keys()),
@@ -175,7 +169,7 @@ def show_revenue_analysis():
     
     with col2:
         # Revenue distribution
-        charges = [slot['charge'] for slot in occupied_slots]
+        charges = [slot.charge / 100 for slot in occupied_slots]
         
         fig_hist = px.histogram(
             charges,
@@ -186,12 +180,11 @@ def show_revenue_analysis():
         )
         st.plotly_chart(fig_hist, use_container_width=True)
 
-def show_vehicle_type_breakdown():
+def show_vehicle_type_breakdown(parking_data):
     """Display vehicle type breakdown"""
     st.markdown("### 🚗 Vehicle Type Analysis")
     
-    parking_data = st.session_state.parking_data
-    occupied_slots = [slot for slot in parking_data if slot['vehicleType'] is not None]
+    occupied_slots = [slot for slot in parking_data if slot.is_occupied]
     
     if not occupied_slots:
         st.info("No occupied slots available for vehicle type analysis")
@@ -200,7 +193,7 @@ def show_vehicle_type_breakdown():
     # Count vehicle types
     vehicle_counts = {}
     for slot in occupied_slots:
-        vehicle_type = slot['vehicleType']
+        vehicle_type = slot.vehicle_type.label
         if vehicle_type not in vehicle_counts:
             vehicle_counts[vehicle_type] = 0
         vehicle_counts[vehicle_type] += 1
@@ -223,12 +216,12 @@ def show_vehicle_type_breakdown():
         vehicle_charge_counts = {}
         
         for slot in occupied_slots:
-            vehicle_type = slot['vehicleType']
+            vehicle_type = slot.vehicle_type.label
             if vehicle_type not in vehicle_avg_charge:
                 vehicle_avg_charge[vehicle_type] = 0
                 vehicle_charge_counts[vehicle_type] = 0
             
-            vehicle_avg_charge[vehicle_type] += slot['charge']
+            vehicle_avg_charge[vehicle_type] += slot.charge / 100
             vehicle_charge_counts[vehicle_type] += 1
         
         # Calculate averages
@@ -245,35 +238,33 @@ def show_vehicle_type_breakdown():
         )
         st.plotly_chart(fig_avg, use_container_width=True)
 
-def show_detailed_table():
+def show_detailed_table(parking_data):
     """Display detailed parking data table"""
     st.markdown("### 📋 Detailed Parking Data")
     
-    parking_data = st.session_state.parking_data
-    
     # Prepare data for table
     table_data = []
     for slot in parking_data:
-        if slot['vehicleType'] is not None:
+        if slot.is_occupied:
             table_data.append({
-                'Slot': slot['slot'],
-                'Vehicle Type': slot['vehicleType'],
-                'Vehicle Number': slot['vehicleNumber'],
-                'Arrival Date': slot['arrivalDate'],
-                'Arrival Time': slot['arrivalTime'],
-                'Expected Pickup': f"{slot['expectedPickupDate']} {slot['expectedPickupTime']}",
-                'Weekday': slot['weekday'],
-                'Charge (₹)': slot['charge']
+                'Slot': slot.slot,
+                'Vehicle Type': slot.vehicle_type.label,
+                'Vehicle Number': slot.vehicle_number,
+                'Arrival Date': slot.arrival_date,
+                'Arrival Time': slot.arrival_time,
+                'Expected Pickup': f"{slot.pickup_date} {slot.pickup_time}",
+                'Weekday': slot.weekday,
+                'Charge (₹)': slot.charge_rupees
             })
-        elif slot['isReserved']:
-            reservation = slot['reservationData']
+        elif slot.is_reserved:
+            reservation = slot.reservation
             table_data.append({
-                'Slot': slot['slot'],
-                'Vehicle Type': f"Reserved - {reservation['vehicleType']}",
-                'Vehicle Number': reservation['vehicleNumber'],
-                'Arrival Date': reservation['date'],
-                'Arrival Time': reservation['time'],
-                'Expected Pickup': f"Duration: {reservation['duration']} hours",
+                'Slot': slot.slot,
+                'Vehicle Type': f"Reserved - {reservation.vehicle_type.label}",
+                'Vehicle Number': reservation.vehicle_number,
+                'Arrival Date': reservation.date,
+                'Arrival Time': reservation.time,
+                'Expected Pickup': f"Duration: {reservation.duration} hours",
                 'Weekday': 'Reserved',
                 'Charge (₹)': 'TBD'
             })
@@ -1,7 +1,8 @@
 import streamlit as st
-import time
 from utils.detection_api import DetectionAPI
 from utils.parking_logic import ParkingLogic
+from utils.data_manager import SaveConflictError
+from utils.state_cache import get_state_cache
 import datetime
 def main():
     st.title("🤖 AI Auto Detection Mode")
@@ -83,6 +84,9 @@ def main():
         
         if health.get('status') == 'healthy':
             st.success("✅ Detection server is running and ready")
+            latency = detection_api.latency_stats().get('health')
+            if latency:
+                st.caption(f"Round trip: {latency['last_ms']:.0f} ms (avg {latency['avg_ms']:.0f} ms over {latency['count']} checks)")
         else:
             st.error(f"❌ Detection server unavailable: {health.get('message', 'Unknown error')}")
             st.info("Please make sure to run `python server.py` before using Auto Mode")
@@ -157,6 +161,8 @@ def start_detection(detection_api):
     result = detection_api.start_detection()
     
     if result.get('status') == 'started':
+        st.session_state.detection_session_id = result.get('session_id')
+        st.session_state.detection_version = None
         st.session_state.detection_active = True
         st.session_state.detection_status = 'running'
         st.success("🚀 Detection started! Follow the camera instructions.")
@@ -173,7 +179,8 @@ def stop_detection(detection_api):
 
 def reset_detection(detection_api):
     """Reset the detection system"""
-    result = detection_api.reset_detection()
+    result = detection_api.reset_detection(st.session_state.get('detection_session_id'))
+    st.session_state.detection_session_id = None
     
     st.session_state.detection_active = False
     st.session_state.detection_results = {}
@@ -194,47 +201,58 @@ def show_detection_status(detection_api):
     status_placeholder = st.empty()
     progress_placeholder = st.empty()
     
-    # Auto-refresh every 2 seconds
     if st.session_state.detection_active:
-        result = detection_api.get_results()
+        session_id = st.session_state.get('detection_session_id')
         
-        current_phase = result.get('current_phase', 'Starting...')
-        message = result.get('message', '')
-        status = result.get('status', 'running')
+        # Follow the server's event stream, updates arrive as soon as a phase changes
+        for result in detection_api.stream_events(session_id):
+            render_detection_update(result, status_placeholder, progress_placeholder)
         
-        with status_placeholder.container():
-            if status == 'running':
-                st.info(f"🔄 {current_phase}")
-                if message:
-                    st.write(f"💡 {message}")
-            elif status == 'completed':
-                st.success(f"✅ {current_phase}")
-                st.session_state.detection_active = False
-                st.session_state.detection_results = result.get('results', {})
-                st.rerun()
-            elif status == 'error':
-                st.error(f"❌ Error: {message}")
-                st.session_state.detection_active = False
-                st.rerun()
+        # Stream unavailable or closed early: long-poll until the state version changes
+        result = detection_api.get_results(session_id, since=st.session_state.get('detection_version'))
+        render_detection_update(result, status_placeholder, progress_placeholder)
+        st.rerun()
+
+def render_detection_update(result, status_placeholder, progress_placeholder):
+    """Show one detection state, reruns the page once the session has finished"""
+    st.session_state.detection_version = result.get('version')
+    current_phase = result.get('current_phase') or 'Starting...'
+    message = result.get('message', '')
+    status = result.get('status', 'running')
+    
+    with status_placeholder.container():
+        if status == 'running':
+            st.info(f"🔄 {current_phase}")
+            if message:
+                st.write(f"💡 {message}")
+        elif status == 'completed':
+            st.success(f"✅ {current_phase}")
+            st.session_state.detection_active = False
+            st.session_state.detection_results = result.get('results', {})
+            st.rerun()
+        elif status == 'error':
+            st.error(f"❌ Error: {message}")
+            st.session_state.detection_active = False
+            st.rerun()
+        elif status in ('cancelled', 'not_found'):
+            st.warning(f"⚠️ {message}")
+            st.session_state.detection_active = False
+            st.rerun()
+    
+    # Progress indicator
+    with progress_placeholder.container():
+        phases = ['Vehicle Detection', 'License Plate', 'Hand Gesture']
+        progress_value = 0
         
-        # Progress indicator
-        with progress_placeholder.container():
-            phases = ['Vehicle Detection', 'License Plate', 'Hand Gesture']
-            progress_value = 0
-            
-            if 'vehicle' in current_phase.lower():
-                progress_value = 33
-            elif 'license' in current_phase.lower() or 'plate' in current_phase.lower():
-                progress_value = 66
-            elif 'hand' in current_phase.lower() or 'gesture' in current_phase.lower():
-                progress_value = 100
-            
-            st.progress(progress_value / 100)
-            st.write(f"Progress: {progress_value}%")
+        if 'vehicle' in current_phase.lower():
+            progress_value = 33
+        elif 'license' in current_phase.lower() or 'plate' in current_phase.lower():
+            progress_value = 66
+        elif 'hand' in current_phase.lower() or 'gesture' in current_phase.lower():
+            progress_value = 100
         
-        # Auto-refresh
-        time.sleep(2)
-        st.rerun()
+        st.progress(progress_value / 100)
+        st.write(f"Progress: {progress_value}%")
 
 def show_detection_results():
     """Display detection results and allow parking"""
@@ -317,11 +335,10 @@ def park_detected_vehicle(results, manual_vehicle_type, manual_license, manual_h
     # Park the vehicle
     parking_logic = init_parking_logic()
     
-    # Load current parking data
-    if 'parking_data' not in st.session_state:
-        from utils.data_manager import DataManager
-        data_manager = DataManager()
-        st.session_state.parking_data = data_manager.load_parking_data()
+    # Start from the latest saved state unless this session already holds it
+    state_cache = get_state_cache()
+    if 'parking_data' not in st.session_state or st.session_state.get('parking_version') != state_cache.version:
+        st.session_state.parking_data, st.session_state.parking_version = state_cache.mutable_copy()
     
     result = parking_logic.park_vehicle(
         st.session_state.parking_data,
@@ -331,6 +348,16 @@ def park_detected_vehicle(results, manual_vehicle_type, manual_license, manual_h
     )
     
     if result['success']:
+        # Save data, merged with changes other sessions made to other slots
+        try:
+            st.session_state.parking_version = state_cache.save(
+                st.session_state.parking_data, base_version=st.session_state.get('parking_version')
+            )
+        except SaveConflictError as e:
+            st.error(f"Could not park the vehicle: {e}")
+            st.session_state.parking_data, st.session_state.parking_version = state_cache.mutable_copy()
+            return
+        
         st.success(f"🎉 Vehicle successfully parked in Slot {result['slot']}!")
         
         # Show parking details
@@ -345,11 +372,6 @@ def park_detected_vehicle(results, manual_vehicle_type, manual_license, manual_h
         - Night Rate: {'Yes' if charge_info['nightRate'] else 'No'}
         """)
         
-        # Save data
-        from utils.data_manager import DataManager
-        data_manager = DataManager()
-        data_manager.save_parking_data(st.session_state.parking_data)
-        
         # Clear results
         st.session_state.detection_results = {}
         
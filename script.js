@@ -9,6 +9,15 @@ let currentSelectedReservedSlot = null;
 let autoModeActive = false;
 let detectionInProgress = false;
 let detectionStartTime = null;
+let detectionSessionId = null;
+let detectionVersion = null;
+let detectionEvents = null;
+
+// Address the detection session started by this page, the server can run several at once
+function detectionSessionUrl(endpoint) {
+    const url = `http://localhost:8000/${endpoint}`;
+    return detectionSessionId ? `${url}/${detectionSessionId}` : url;
+}
 
 // Theme management
 function toggleTheme() {
@@ -190,7 +199,7 @@ function getPhaseTip(currentPhase) {
         if (phase.includes('confirm')) {
             return "💡 Make an OK gesture (thumb and index finger in a circle) to confirm the parking duration.";
         }
-        return "💡 Show 1-10 fingers to indicate parking hours. Hold the same number for 3 seconds.";
+        return "💡 Show 1-10 fingers to indicate parking hours. Hold the same number steady until it is confirmed.";
     }
     
     return "💡 Follow the on-screen instructions for each detection phase.";
@@ -281,8 +290,10 @@ function startDetectionProcess() {
     .then(response => response.json())
     .then(data => {
         if (data.status === 'started') {
+            detectionSessionId = data.session_id || null;
+            detectionVersion = null;
             showNotification('AI detection started successfully', 'success');
-            pollDetectionResults();
+            subscribeDetectionEvents();
         } else {
             throw new Error(data.message || 'Failed to start detection');
         }
@@ -300,145 +311,180 @@ function startDetectionProcess() {
     });
 }
 
+// Receive phase and result updates pushed by the server as they happen
+function subscribeDetectionEvents() {
+    if (!window.EventSource) {
+        pollDetectionResults();
+        return;
+    }
+
+    closeDetectionEvents();
+    detectionEvents = new EventSource(detectionSessionUrl('events'));
+    detectionEvents.addEventListener('state', event => {
+        handleDetectionUpdate(JSON.parse(event.data));
+        if (!detectionInProgress) closeDetectionEvents();
+    });
+    detectionEvents.onerror = () => {
+        // Stream dropped before the session finished, fall back to long-polling
+        closeDetectionEvents();
+        if (detectionInProgress) pollDetectionResults();
+    };
+}
+
+function closeDetectionEvents() {
+    if (detectionEvents) {
+        detectionEvents.close();
+        detectionEvents = null;
+    }
+}
+
+// Long-poll: the server answers once the session state moves past detectionVersion
 function pollDetectionResults() {
     if (!detectionInProgress) return;
 
-    fetch('http://localhost:8000/get_results')
+    const url = detectionSessionUrl('get_results');
+    fetch(detectionVersion === null ? url : `${url}?since=${detectionVersion}`)
     .then(response => response.json())
     .then(data => {
-        const statusDiv = document.getElementById('detectionStatus');
-        const resultsDiv = document.getElementById('detectionResults');
-
-        if (data.status === 'running') {
-            // Determine current phase for progress indicator
-            let phaseProgress = getPhaseProgress(data.current_phase);
-            let elapsedTime = detectionStartTime ? Math.floor((Date.now() - detectionStartTime) / 1000) : 0;
-            let phaseTip = getPhaseTip(data.current_phase);
-            
-            statusDiv.innerHTML = `
-                <div style="text-align: center;">
-                    <i class="fas fa-spinner fa-spin" style="font-size: 2rem; color: var(--accent-primary); margin-bottom: 1rem;"></i>
-                    <p style="color: var(--accent-primary); font-weight: 600;">${data.current_phase || 'Processing...'}</p>
-                    ${data.message ? `<p style="color: var(--text-secondary); font-size: 0.9rem; margin-top: 0.5rem;">${data.message}</p>` : ''}
-                    <div style="margin-top: 1rem; padding: 1rem; background: var(--bg-glass); border-radius: 8px; border: 1px solid var(--border-primary);">
-                        <p style="font-size: 0.8rem; color: var(--text-muted); margin-bottom: 0.5rem;">Detection Progress:</p>
-                        <div style="display: flex; justify-content: space-between; font-size: 0.75rem;">
-                            <span style="color: ${phaseProgress.vehicle};">${phaseProgress.vehicle === 'var(--accent-green)' ? '✓' : phaseProgress.vehicle === 'var(--accent-orange)' ? '⏳' : '⏸'} Vehicle Detection</span>
-                            <span style="color: ${phaseProgress.license};">${phaseProgress.license === 'var(--accent-green)' ? '✓' : phaseProgress.license === 'var(--accent-orange)' ? '⏳' : '⏸'} License Plate</span>
-                            <span style="color: ${phaseProgress.gesture};">${phaseProgress.gesture === 'var(--accent-green)' ? '✓' : phaseProgress.gesture === 'var(--accent-orange)' ? '⏳' : '⏸'} Hand Gesture</span>
-                        </div>
-                        <div style="margin-top: 0.5rem; padding-top: 0.5rem; border-top: 1px solid var(--border-primary);">
-                            <p style="font-size: 0.7rem; color: var(--text-muted);">Elapsed: ${elapsedTime}s</p>
-                        </div>
+        handleDetectionUpdate(data);
+        if (detectionInProgress) pollDetectionResults();
+    })
+    .catch(error => {
+        console.error('Error polling results:', error);
+        detectionInProgress = false;
+        updateAutoModeStatus();
+        showNotification('Error communicating with AI detection server', 'error');
+    });
+}
+
+function handleDetectionUpdate(data) {
+    detectionVersion = data.version ?? detectionVersion;
+    const statusDiv = document.getElementById('detectionStatus');
+    const resultsDiv = document.getElementById('detectionResults');
+
+    if (data.status === 'running') {
+        // Determine current phase for progress indicator
+        let phaseProgress = getPhaseProgress(data.current_phase);
+        let elapsedTime = detectionStartTime ? Math.floor((Date.now() - detectionStartTime) / 1000) : 0;
+        let phaseTip = getPhaseTip(data.current_phase);
+        
+        statusDiv.innerHTML = `
+            <div style="text-align: center;">
+                <i class="fas fa-spinner fa-spin" style="font-size: 2rem; color: var(--accent-primary); margin-bottom: 1rem;"></i>
+                <p style="color: var(--accent-primary); font-weight: 600;">${data.current_phase || 'Processing...'}</p>
+                ${data.message ? `<p style="color: var(--text-secondary); font-size: 0.9rem; margin-top: 0.5rem;">${data.message}</p>` : ''}
+                <div style="margin-top: 1rem; padding: 1rem; background: var(--bg-glass); border-radius: 8px; border: 1px solid var(--border-primary);">
+                    <p style="font-size: 0.8rem; color: var(--text-muted); margin-bottom: 0.5rem;">Detection Progress:</p>
+                    <div style="display: flex; justify-content: space-between; font-size: 0.75rem;">
+                        <span style="color: ${phaseProgress.vehicle};">${phaseProgress.vehicle === 'var(--accent-green)' ? '✓' : phaseProgress.vehicle === 'var(--accent-orange)' ? '⏳' : '⏸'} Vehicle Detection</span>
+                        <span style="color: ${phaseProgress.license};">${phaseProgress.license === 'var(--accent-green)' ? '✓' : phaseProgress.license === 'var(--accent-orange)' ? '⏳' : '⏸'} License Plate</span>
+                        <span style="color: ${phaseProgress.gesture};">${phaseProgress.gesture === 'var(--accent-green)' ? '✓' : phaseProgress.gesture === 'var(--accent-orange)' ? '⏳' : '⏸'} Hand Gesture</span>
                     </div>
-                    <div style="margin-top: 1rem; padding: 0.75rem; background: rgba(59, 130, 246, 0.1); border-radius: 8px; border: 1px solid rgba(59, 130, 246, 0.3);">
-                        <p style="font-size: 0.8rem; color: var(--accent-blue); font-weight: 500;">${phaseTip}</p>
+                    <div style="margin-top: 0.5rem; padding-top: 0.5rem; border-top: 1px solid var(--border-primary);">
+                        <p style="font-size: 0.7rem; color: var(--text-muted);">Elapsed: ${elapsedTime}s</p>
                     </div>
                 </div>
-            `;
-            
-            // Continue polling
-            setTimeout(pollDetectionResults, 2000);
-        } else if (data.status === 'completed') {
-            detectionInProgress = false;
-            const results = data.results || {};
-            
-            // Re-enable modal close button
-            const modal = document.getElementById('autoModeModal');
-            const closeBtn = modal.querySelector('.close-btn');
-            closeBtn.style.display = 'block';
-            
-            statusDiv.innerHTML = `
-                <div style="text-align: center;">
-                    <i class="fas fa-check-circle" style="font-size: 2rem; color: var(--accent-green); margin-bottom: 1rem;"></i>
-                    <p style="color: var(--accent-green); font-weight: 600;">Detection Completed!</p>
+                <div style="margin-top: 1rem; padding: 0.75rem; background: rgba(59, 130, 246, 0.1); border-radius: 8px; border: 1px solid rgba(59, 130, 246, 0.3);">
+                    <p style="font-size: 0.8rem; color: var(--accent-blue); font-weight: 500;">${phaseTip}</p>
                 </div>
-            `;
-            
-            resultsDiv.innerHTML = `
-                <div style="background: var(--bg-glass); border-radius: 12px; padding: 1.5rem; margin-top: 1rem; border: 1px solid var(--border-primary);">
-                    <h4 style="color: var(--accent-primary); margin-bottom: 1rem;">Detection Results:</h4>
-                    <div style="display: grid; gap: 0.75rem;">
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <span><strong>Vehicle Type:</strong></span>
-                            <span style="color: ${results.vehicle_type ? 'var(--accent-green)' : 'var(--accent-red)'};">${results.vehicle_type || 'Not detected'}</span>
-                        </div>
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <span><strong>License Plate:</strong></span>
-                            <span style="color: ${results.license_plate ? 'var(--accent-green)' : 'var(--accent-red)'};">${results.license_plate || 'Not detected'}</span>
-                        </div>
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <span><strong>Parking Hours:</strong></span>
-                            <span style="color: ${results.parking_hours ? 'var(--accent-green)' : 'var(--accent-red)'};">${results.parking_hours || 'Not detected'}</span>
-                        </div>
+            </div>
+        `;
+
+    } else if (data.status === 'completed') {
+        detectionInProgress = false;
+        const results = data.results || {};
+        
+        // Re-enable modal close button
+        const modal = document.getElementById('autoModeModal');
+        const closeBtn = modal.querySelector('.close-btn');
+        closeBtn.style.display = 'block';
+        
+        statusDiv.innerHTML = `
+            <div style="text-align: center;">
+                <i class="fas fa-check-circle" style="font-size: 2rem; color: var(--accent-green); margin-bottom: 1rem;"></i>
+                <p style="color: var(--accent-green); font-weight: 600;">Detection Completed!</p>
+            </div>
+        `;
+        
+        resultsDiv.innerHTML = `
+            <div style="background: var(--bg-glass); border-radius: 12px; padding: 1.5rem; margin-top: 1rem; border: 1px solid var(--border-primary);">
+                <h4 style="color: var(--accent-primary); margin-bottom: 1rem;">Detection Results:</h4>
+                <div style="display: grid; gap: 0.75rem;">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <span><strong>Vehicle Type:</strong></span>
+                        <span style="color: ${results.vehicle_type ? 'var(--accent-green)' : 'var(--accent-red)'};">${results.vehicle_type || 'Not detected'}</span>
+                    </div>
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <span><strong>License Plate:</strong></span>
+                        <span style="color: ${results.license_plate ? 'var(--accent-green)' : 'var(--accent-red)'};">${results.license_plate || 'Not detected'}</span>
                     </div>
-                    <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid var(--border-primary);">
-                        <p style="font-size: 0.8rem; color: var(--text-muted); text-align: center; margin-bottom: 1rem;">
-                            ${results.vehicle_type && results.license_plate && results.parking_hours ? 
-                                '🎉 All detections successful! Ready to park vehicle.' : 
-                                '⚠️ Some detections failed. You can manually enter missing information.'}
-                        </p>
-                        ${!(results.vehicle_type && results.license_plate && results.parking_hours) ? `
-                            <div style="display: flex; gap: 0.5rem; justify-content: center;">
-                                <button class="btn btn-secondary" onclick="useDetectionResults()" style="width: auto; padding: 0.5rem 1rem; font-size: 0.9rem;">
-                                    <i class="fas fa-check"></i>
-                                    Use Partial Results
-                                </button>
-                                <button class="btn btn-warning" onclick="startAutoDetection()" style="width: auto; padding: 0.5rem 1rem; font-size: 0.9rem;">
-                                    <i class="fas fa-redo"></i>
-                                    Retry Detection
-                                </button>
-                            </div>
-                        ` : ''}
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <span><strong>Parking Hours:</strong></span>
+                        <span style="color: ${results.parking_hours ? 'var(--accent-green)' : 'var(--accent-red)'};">${results.parking_hours || 'Not detected'}</span>
                     </div>
                 </div>
-            `;
-            
-            showNotification('AI detection completed successfully!', 'success');
-        } else if (data.status === 'error') {
-            detectionInProgress = false;
-            
-            // Re-enable modal close button
-            const modal = document.getElementById('autoModeModal');
-            const closeBtn = modal.querySelector('.close-btn');
-            closeBtn.style.display = 'block';
-            
-            statusDiv.innerHTML = `
-                <div style="text-align: center;">
-                    <i class="fas fa-exclamation-triangle" style="font-size: 2rem; color: var(--accent-red); margin-bottom: 1rem;"></i>
-                    <p style="color: var(--accent-red); font-weight: 600;">Detection Error</p>
-                    <p style="font-size: 0.9rem; color: var(--text-secondary);">${data.message || 'Unknown error occurred'}</p>
+                <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid var(--border-primary);">
+                    <p style="font-size: 0.8rem; color: var(--text-muted); text-align: center; margin-bottom: 1rem;">
+                        ${results.vehicle_type && results.license_plate && results.parking_hours ? 
+                            '🎉 All detections successful! Ready to park vehicle.' : 
+                            '⚠️ Some detections failed. You can manually enter missing information.'}
+                    </p>
+                    ${!(results.vehicle_type && results.license_plate && results.parking_hours) ? `
+                        <div style="display: flex; gap: 0.5rem; justify-content: center;">
+                            <button class="btn btn-secondary" onclick="useDetectionResults()" style="width: auto; padding: 0.5rem 1rem; font-size: 0.9rem;">
+                                <i class="fas fa-check"></i>
+                                Use Partial Results
+                            </button>
+                            <button class="btn btn-warning" onclick="startAutoDetection()" style="width: auto; padding: 0.5rem 1rem; font-size: 0.9rem;">
+                                <i class="fas fa-redo"></i>
+                                Retry Detection
+                            </button>
+                        </div>
+                    ` : ''}
                 </div>
-            `;
-            
-            resultsDiv.innerHTML = `
-                <div style="background: var(--bg-glass); border-radius: 12px; padding: 1.5rem; margin-top: 1rem; border: 1px solid var(--accent-red);">
-                    <div style="text-align: center;">
-                        <p style="color: var(--accent-red); margin-bottom: 1rem;">No detection results available</p>
-                        <button class="btn btn-secondary" onclick="startAutoDetection()" style="width: auto; padding: 0.5rem 1rem; font-size: 0.9rem;">
-                            <i class="fas fa-redo"></i>
-                            Retry Detection
-                        </button>
-                    </div>
+            </div>
+        `;
+        
+        showNotification('AI detection completed successfully!', 'success');
+    } else if (data.status === 'error') {
+        detectionInProgress = false;
+        
+        // Re-enable modal close button
+        const modal = document.getElementById('autoModeModal');
+        const closeBtn = modal.querySelector('.close-btn');
+        closeBtn.style.display = 'block';
+        
+        statusDiv.innerHTML = `
+            <div style="text-align: center;">
+                <i class="fas fa-exclamation-triangle" style="font-size: 2rem; color: var(--accent-red); margin-bottom: 1rem;"></i>
+                <p style="color: var(--accent-red); font-weight: 600;">Detection Error</p>
+                <p style="font-size: 0.9rem; color: var(--text-secondary);">${data.message || 'Unknown error occurred'}</p>
+            </div>
+        `;
+        
+        resultsDiv.innerHTML = `
+            <div style="background: var(--bg-glass); border-radius: 12px; padding: 1.5rem; margin-top: 1rem; border: 1px solid var(--accent-red);">
+                <div style="text-align: center;">
+                    <p style="color: var(--accent-red); margin-bottom: 1rem;">No detection results available</p>
+                    <button class="btn btn-secondary" onclick="startAutoDetection()" style="width: auto; padding: 0.5rem 1rem; font-size: 0.9rem;">
+                        <i class="fas fa-redo"></i>
+                        Retry Detection
+                    </button>
                 </div>
-            `;
-            
-            showNotification('AI detection failed: ' + (data.message || 'Unknown error'), 'error');
-        } else {
-            // Continue polling for other statuses
-            setTimeout(pollDetectionResults, 2000);
-        }
-    })
-    .catch(error => {
-        console.error('Error polling results:', error);
+            </div>
+        `;
+        
+        showNotification('AI detection failed: ' + (data.message || 'Unknown error'), 'error');
+    } else if (data.status === 'cancelled' || data.status === 'not_found') {
         detectionInProgress = false;
         updateAutoModeStatus();
-        showNotification('Error communicating with AI detection server', 'error');
-    });
+        showNotification(data.message || 'Detection stopped', 'warning');
+    }
 }
 
 function resetDetection() {
-    fetch('http://localhost:8000/reset', {
+    closeDetectionEvents();
+    fetch(detectionSessionUrl('reset'), {
         method: 'POST'
     })
     .then(response => response.json())
@@ -461,7 +507,7 @@ function resetDetection() {
 }
 
 function useDetectionResults() {
-    fetch('http://localhost:8000/get_results')
+    fetch(detectionSessionUrl('get_results'))
     .then(response => response.json())
     .then(data => {
         if (data.status === 'completed' && data.results) {
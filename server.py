@@ -6,12 +6,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Add this function for better error handling
-def handle_detection_error(error_message):
+def handle_detection_error(session, error_message):
     """Handle detection errors gracefully"""
     logger.error(f"Detection error: {error_message}")
-    detection_status['status'] = 'error'
-    detection_status['message'] = error_message
-    detection_status['current_phase'] = 'Error occurred'
+    session.update_status(status='error', message=error_message, current_phase='Error occurred')
 
 import os
 from dotenv import load_dotenv
@@ -19,26 +17,69 @@ load_dotenv()  # Load environment variables from .env file
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
+# CPU threads for model inference (PyTorch, ONNX Runtime and OpenVINO), 0 lets each runtime decide.
+# Must be set before the runtimes load.
+INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', 0))
+if INFERENCE_THREADS > 0:
+    os.environ.setdefault("OMP_NUM_THREADS", str(INFERENCE_THREADS))
+
 import cv2
 import time
 import numpy as np
-from ultralytics import YOLO
+import torch
 import re
-import requests
-import base64
 import json
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import threading
-import queue
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from utils.ocr_backends import create_ocr_backend, OCRSpaceBackend
+from utils.ocr_cache import OCRCache
+from utils.camera import CameraManager, parse_camera_allow_list, parse_camera_source
+from utils.preview import PreviewBroadcaster
+from utils.inference_scheduler import InferenceScheduler
+from utils.model_export import load_model, MODEL_BACKENDS
+from utils.sessions import SessionManager, empty_results
+from utils.metrics import MetricsRegistry
+from utils.confirmation import DetectionConfirmer
+from utils.gestures import analyze_hands, landmarks_to_array, VoteSmoother
+from utils.hand_tracker import HandTrackerPool
 
 # Load configuration from environment variables
 PORT = int(os.getenv('PORT', 8000))
 YOLO_MODEL_PATH = os.getenv('YOLO_MODEL_PATH', 'best.pt')
+VEHICLE_MODEL_PATH = os.getenv('VEHICLE_MODEL_PATH', 'yolo11n.pt')
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'pytorch').lower()  # pytorch, onnx or openvino
 CONFIDENCE_THRESHOLD = float(os.getenv('CONFIDENCE_THRESHOLD', 0.25))
-CAMERA_ID = int(os.getenv('CAMERA_ID', 0))
+CAMERA_ID = parse_camera_source(os.getenv('CAMERA_ID', '0'))  # Webcam index, video file or image directory
+# Other cameras a /start_detection request may name, as name=source pairs separated by commas
+CAMERA_SOURCES = parse_camera_allow_list(os.getenv('CAMERA_SOURCES', ''), CAMERA_ID)
+REPLAY_REALTIME = os.getenv('REPLAY_REALTIME', 'true').lower() == 'true'  # Replay recordings at native speed
+INFERENCE_STRIDE = int(os.getenv('INFERENCE_STRIDE', 3))  # Run YOLO on every Nth frame
+INFERENCE_INTERVAL = float(os.getenv('INFERENCE_INTERVAL', 0))  # Seconds between YOLO runs, overrides the stride when set
+BORDERLINE_CONFIDENCE = float(os.getenv('BORDERLINE_CONFIDENCE', 0.5))  # Below this, YOLO runs on every frame
+CONFIRM_FRAMES = int(os.getenv('CONFIRM_FRAMES', 5))  # Consecutive agreeing inferences that confirm a vehicle or plate
+CONFIRM_CONFIDENCE = float(os.getenv('CONFIRM_CONFIDENCE', 0.85))  # A single inference at this confidence confirms at once
+GESTURE_CONFIRM_FRAMES = int(os.getenv('GESTURE_CONFIRM_FRAMES', 15))  # Consecutive frames showing the same finger count
+GESTURE_PROCESS_WIDTH = int(os.getenv('GESTURE_PROCESS_WIDTH', 480))  # MediaPipe input width, independent of the capture size
+GESTURE_MODEL_COMPLEXITY = int(os.getenv('GESTURE_MODEL_COMPLEXITY', 1))
+GESTURE_LATENCY_BUDGET = float(os.getenv('GESTURE_LATENCY_BUDGET', 0.05))  # Seconds per frame before falling back to model_complexity=0, 0 to disable
+PLATE_ROI_ENABLED = os.getenv('PLATE_ROI_ENABLED', 'true').lower() == 'true'  # Search for the plate inside the phase 1 vehicle box
+PLATE_ROI_MARGIN = float(os.getenv('PLATE_ROI_MARGIN', 0.1))  # Fraction of the vehicle box added on each side
+PLATE_INFERENCE_SIZE = int(os.getenv('PLATE_INFERENCE_SIZE', 320))  # Plate model input size when running on the ROI
+PLATE_ROI_MAX_MISSES = int(os.getenv('PLATE_ROI_MAX_MISSES', 15))  # Fall back to the full frame after this many empty ROI inferences
+HEADLESS = os.getenv('HEADLESS', 'false').lower() == 'true'  # No desktop windows, draw overlays only for the preview stream
+PREVIEW_FPS = float(os.getenv('PREVIEW_FPS', 5))
+PLATE_AUDIT_DIR = os.getenv('PLATE_AUDIT_DIR')  # Save every captured plate crop here when set
 FRAME_WIDTH = int(os.getenv('FRAME_WIDTH', 640))
 FRAME_HEIGHT = int(os.getenv('FRAME_HEIGHT', 480))
+CAMERA_BUFFER_SIZE = int(os.getenv('CAMERA_BUFFER_SIZE', 2))
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', 2))  # Vehicles processed at once, one per camera
+MAX_QUEUED_SESSIONS = int(os.getenv('MAX_QUEUED_SESSIONS', 4))
+LONG_POLL_TIMEOUT = float(os.getenv('LONG_POLL_TIMEOUT', 25))  # Longest a /get_results?since= request waits for a change
+EVENTS_KEEPALIVE = float(os.getenv('EVENTS_KEEPALIVE', 15))  # Seconds between keep-alive comments on an idle event stream
 
 # Try importing mediapipe with error handling
 try:
@@ -68,24 +109,62 @@ CORS(app, resources={
     }
 })
 
-# Global variables to store detection state
-detection_results = {
-    'vehicle_type': None,
-    'license_plate': None,
-    'parking_hours': None
-}
+# One capture thread per camera, shared by all three detection phases
+camera_manager = CameraManager(FRAME_WIDTH, FRAME_HEIGHT, fps=30, buffer_size=CAMERA_BUFFER_SIZE,
+                               realtime=REPLAY_REALTIME)
 
-detection_status = {
-    'status': 'idle',  # idle, running, completed, error
-    'current_phase': None,
-    'message': None
-}
+# Recent per-frame processing times by phase, used by the replay benchmark
+frame_timings = {phase: deque(maxlen=10000) for phase in ('vehicle', 'plate', 'gesture')}
 
-detection_queue = queue.Queue()
+# MediaPipe graphs are built once and reused by later gesture phases
+hand_trackers = HandTrackerPool(
+    process_width=GESTURE_PROCESS_WIDTH,
+    model_complexity=GESTURE_MODEL_COMPLEXITY,
+    latency_budget=GESTURE_LATENCY_BUDGET
+)
+
+# Annotated frames for the /preview MJPEG stream
+preview = PreviewBroadcaster(fps=PREVIEW_FPS)
+
+# Series exposed on /metrics in the Prometheus text format
+metrics = MetricsRegistry(prefix='parking_')
+phase_duration_seconds = metrics.histogram(
+    'detection_phase_duration_seconds', 'Time spent in each detection phase per vehicle', ('phase', 'camera'))
+yolo_inference_seconds = metrics.histogram(
+    'yolo_inference_seconds', 'YOLO inference time per frame', ('model',))
+ocr_request_seconds = metrics.histogram(
+    'ocr_request_seconds', 'OCR call latency per image enhancement method', ('method',))
+plate_ocr_total = metrics.counter(
+    'plate_ocr_total', 'Captured plates by OCR outcome', ('outcome',))
 
 # OCR.space API configuration
 OCR_API_KEY = os.getenv('OCR_API_KEY', "K83315680088957")
 OCR_API_URL = os.getenv('OCR_API_URL', "https://api.ocr.space/parse/image")
+OCR_BACKEND = os.getenv('OCR_BACKEND', 'ocrspace')  # ocrspace, tesseract or replay
+OCR_REPLAY_DIR = os.getenv('OCR_REPLAY_DIR', os.path.join('data', 'ocr_recordings'))
+OCR_RECORD_DIR = os.getenv('OCR_RECORD_DIR')  # Record live responses here for later replay
+OCR_MAX_WORKERS = int(os.getenv('OCR_MAX_WORKERS', 5))
+OCR_TOTAL_TIMEOUT = float(os.getenv('OCR_TOTAL_TIMEOUT', 20))
+OCR_REQUEST_TIMEOUT = float(os.getenv('OCR_REQUEST_TIMEOUT', 8))  # Per variant, abandoned requests hold an OCR worker at most this long
+OCR_CACHE_SIZE = int(os.getenv('OCR_CACHE_SIZE', 256))
+OCR_CACHE_TTL = float(os.getenv('OCR_CACHE_TTL', 3600))
+OCR_CACHE_DIR = os.getenv('OCR_CACHE_DIR', os.path.join('data', 'ocr_cache'))  # Empty to keep the cache in memory only
+OCR_CACHE_MAX_DIFF = float(os.getenv('OCR_CACHE_MAX_DIFF', 0.5))  # Largest thumbnail difference still treated as the same plate
+
+# Shared pool so enhancement variants of one plate are sent to OCR concurrently
+ocr_executor = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix='ocr')
+
+ocr_backend = create_ocr_backend(
+    OCR_BACKEND,
+    api_key=OCR_API_KEY,
+    api_url=OCR_API_URL,
+    replay_dir=OCR_REPLAY_DIR,
+    record_dir=OCR_RECORD_DIR
+)
+
+# Repeated captures of the same vehicle skip the OCR round trip entirely
+ocr_cache = OCRCache(max_entries=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL, cache_dir=OCR_CACHE_DIR or None,
+                     max_difference=OCR_CACHE_MAX_DIFF)
 
 # Complete list of Indian state and UT codes
 INDIAN_STATE_CODES = {
@@ -110,35 +189,93 @@ vehicle_classes_mapping = {
     "truck": "Heavy Vehicle (Bus/Truck)"
 }
 
-def ocr_space_api(image, api_key=OCR_API_KEY, language='eng'):
-    """OCR.space API request with error handling."""
-    try:
-        _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
-        img_base64 = base64.b64encode(buffer).decode()
-        
-        payload = {
-            'apikey': api_key,
-            'language': language,
-            'isOverlayRequired': False,
-            'base64Image': f'data:image/jpeg;base64,{img_base64}',
-            'OCREngine': '2',
-            'scale': 'true',
-            'isTable': 'false'
+if INFERENCE_THREADS > 0:
+    torch.set_num_threads(INFERENCE_THREADS)
+
+class ModelRegistry:
+    """Load each YOLO model once per process and keep it warm between detection runs"""
+
+    def __init__(self, backend='pytorch'):
+        if backend not in MODEL_BACKENDS:
+            logger.warning(f"Unknown MODEL_BACKEND '{backend}', using pytorch")
+            backend = 'pytorch'
+        self.backend = backend
+        self._paths = {}
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        """Register a model path under a name without loading it"""
+        self._paths[name] = path
+        self._stats[name] = {
+            'path': path,
+            'backend': self.backend,
+            'loaded': False,
+            'load_time': None,
+            'warmup_time': None,
+            'error': None
         }
-        
-        r = requests.post(OCR_API_URL, data=payload, timeout=30)
-        if r.status_code == 200:
-            result = r.json()
-            return result
-        else:
-            return {"error": f"API request failed with status code {r.status_code}: {r.text}"}
-            
-    except requests.exceptions.Timeout:
-        return {"error": "API request timed out"}
-    except requests.exceptions.RequestException as e:
-        return {"error": f"API request failed: {str(e)}"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+
+    def _load(self, name):
+        path = self._paths[name]
+        stats = self._stats[name]
+        try:
+            start = time.perf_counter()
+            try:
+                model = load_model(path, self.backend, threads=INFERENCE_THREADS)
+            except Exception as e:
+                if self.backend == 'pytorch':
+                    raise
+                # An export or runtime problem should not take detection down
+                logger.warning(f"Could not load '{name}' with {self.backend} ({e}), falling back to pytorch")
+                stats['backend'] = 'pytorch'
+                model = load_model(path, 'pytorch')
+            stats['load_time'] = round(time.perf_counter() - start, 3)
+
+            # The first inference allocates buffers and fuses layers, pay for it here
+            start = time.perf_counter()
+            dummy_frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+            model(dummy_frame, verbose=False)
+            stats['warmup_time'] = round(time.perf_counter() - start, 3)
+
+            stats['loaded'] = True
+            stats['error'] = None
+            self._models[name] = model
+            logger.info(f"Model '{name}' loaded in {stats['load_time']}s, warm-up {stats['warmup_time']}s")
+        except Exception as e:
+            stats['error'] = str(e)
+            logger.error(f"Error loading model '{name}' from {path}: {e}")
+
+    def get(self, name):
+        """Return the loaded model, loading it on first use. Returns None if it cannot be loaded."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            if name not in self._models and self._stats[name]['error'] is None:
+                self._load(name)
+        return self._models.get(name)
+
+    def load_all(self):
+        """Load and warm up every registered model"""
+        for name in self._paths:
+            self.get(name)
+
+    def all_loaded(self):
+        return all(stats['loaded'] for stats in self._stats.values())
+
+    def status(self):
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+model_registry = ModelRegistry(MODEL_BACKEND)
+model_registry.register('vehicle', VEHICLE_MODEL_PATH)
+model_registry.register('plate', YOLO_MODEL_PATH)
+
+def ocr_space_api(image, api_key=OCR_API_KEY, language='eng', timeout=30):
+    """OCR.space API request with error handling."""
+    return OCRSpaceBackend(api_key, OCR_API_URL, language).recognize(image, timeout=timeout)
 
 def correct_ocr_errors(text):
     """Correct common OCR errors in license plate text"""
@@ -279,6 +416,14 @@ def score_license_plate_text(text):
     
     return score
 
+def is_confident_plate(text):
+    """Check if text is in the top score tier - full plate pattern with a valid state code"""
+    if not text:
+        return False
+    
+    clean_text = re.sub(r'[^A-Z0-9]', '', str(text).upper())
+    return bool(re.match(r'^[A-Z]{2}\d{2}[A-Z]{1,2}\d{4}$', clean_text)) and is_valid_indian_state_code(clean_text[:2])
+
 def extract_license_plate_from_text(text):
     """Extract the most likely license plate from detected text"""
     if not text:
@@ -357,46 +502,101 @@ def clean_indian_plate_text(text):
     cleaned = apply_final_corrections(cleaned)
     return cleaned
 
-def process_license_plate_ocr(original_image):
-    """Process license plate with multiple enhancement techniques"""
+def extract_ocr_candidates(result, method_name):
+    """Extract scored plate candidates from a single OCR response"""
+    candidates = []
+    
+    if "error" in result:
+        return candidates
+    
+    if not result.get("IsErroredOnProcessing", True):
+        parsed_results = result.get("ParsedResults", [])
+        for parsed_result in parsed_results:
+            text = parsed_result.get("ParsedText", "").strip()
+            if text:
+                corrected_text = correct_ocr_errors(text)
+                extracted_plate = extract_license_plate_from_text(corrected_text)
+                
+                if extracted_plate:
+                    score = score_license_plate_text(extracted_plate)
+                    confidence = 0.99
+                    candidates.append((extracted_plate, confidence, method_name, score))
+                
+                lines = corrected_text.split('\n')
+                for line in lines:
+                    clean_text = clean_indian_plate_text(line)
+                    if clean_text and is_valid_license_plate_text(clean_text):
+                        final_text = apply_final_corrections(clean_text)
+                        score = score_license_plate_text(final_text)
+                        confidence = 0.99
+                        candidates.append((final_text, confidence, method_name, score))
+    
+    return candidates
+
+def timed_recognize(backend, image, expires, method_name):
+    """One OCR request, given only the time left until ``expires`` (time.monotonic) and at most OCR_REQUEST_TIMEOUT"""
+    timeout = min(expires - time.monotonic(), OCR_REQUEST_TIMEOUT)
+    if timeout <= 0:
+        return {"error": "OCR deadline passed before the request was sent"}
+    with ocr_request_seconds.time(method=method_name):
+        return backend.recognize(image, timeout=timeout)
+
+def process_license_plate_ocr(original_image, deadline=OCR_TOTAL_TIMEOUT, backend=None, use_cache=True):
+    """Process license plate with multiple enhancement techniques.
+    
+    All variants are sent to OCR concurrently. Variants that have not started are cancelled
+    as soon as one of them yields a confident plate, or when the total deadline for the plate
+    runs out. Requests already in flight cannot be cancelled and are abandoned instead; each
+    is sent with only the time left until the deadline, so it frees its OCR worker by then.
+    Uses the configured OCR_BACKEND unless another backend is passed in. Results for
+    near-identical crops are served from the OCR cache. Full passes and confident early
+    stops are cached, a pass cut short by the deadline or hit by an error is not.
+    """
     if original_image is None:
         return []
     
+    if use_cache:
+        cached = ocr_cache.get(original_image)
+        if cached is not None:
+            print("OCR cache hit, reusing previous result")
+            return cached
+    
+    if backend is None:
+        backend = ocr_backend
+    
     enhanced_images = enhance_image_for_ocr(original_image)
     all_candidates = []
+    complete = True
     
-    for method_name, enhanced_img in enhanced_images:
-        try:
-            result = ocr_space_api(enhanced_img)
-            
-            if "error" in result:
+    expires = time.monotonic() + deadline
+    futures = {
+        ocr_executor.submit(timed_recognize, backend, enhanced_img, expires, method_name): method_name
+        for method_name, enhanced_img in enhanced_images
+    }
+    
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            method_name = futures[future]
+            try:
+                response = future.result()
+                candidates = extract_ocr_candidates(response, method_name)
+            except Exception as e:
+                print(f"Error processing OCR: {e}")
+                complete = False
                 continue
             
-            if not result.get("IsErroredOnProcessing", True):
-                parsed_results = result.get("ParsedResults", [])
-                for parsed_result in parsed_results:
-                    text = parsed_result.get("ParsedText", "").strip()
-                    if text:
-                        corrected_text = correct_ocr_errors(text)
-                        extracted_plate = extract_license_plate_from_text(corrected_text)
-                        
-                        if extracted_plate:
-                            score = score_license_plate_text(extracted_plate)
-                            confidence = 0.99
-                            all_candidates.append((extracted_plate, confidence, method_name, score))
-                        
-                        lines = corrected_text.split('\n')
-                        for line in lines:
-                            clean_text = clean_indian_plate_text(line)
-                            if clean_text and is_valid_license_plate_text(clean_text):
-                                final_text = apply_final_corrections(clean_text)
-                                score = score_license_plate_text(final_text)
-                                confidence = 0.99
-                                all_candidates.append((final_text, confidence, method_name, score))
-                                
-        except Exception as e:
-            print(f"Error processing OCR: {e}")
-            continue
+            if response.get('error') or response.get('IsErroredOnProcessing'):
+                complete = False
+            all_candidates.extend(candidates)
+            if any(is_confident_plate(candidate[0]) for candidate in candidates):
+                print(f"Confident plate found with {method_name}, skipping remaining variants")
+                break
+    except FuturesTimeoutError:
+        print(f"OCR deadline of {deadline}s reached, using candidates found so far")
+        complete = False
+    finally:
+        for future in futures:
+            future.cancel()
     
     if not all_candidates:
         return []
@@ -411,7 +611,29 @@ def process_license_plate_ocr(original_image):
             seen.add(text)
             unique_candidates.append(candidate)
     
-    return [(text, conf, method) for text, conf, method, score in unique_candidates]
+    results = [(text, conf, method) for text, conf, method, score in unique_candidates]
+    if use_cache and complete:
+        ocr_cache.put(original_image, results)
+    return results
+
+# Single background writer so audit images never block the detection loop
+audit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plate-audit')
+
+def save_plate_audit_image(plate_img):
+    """Write a plate crop to PLATE_AUDIT_DIR in the background under a unique name"""
+    if not PLATE_AUDIT_DIR or plate_img is None:
+        return None
+    
+    os.makedirs(PLATE_AUDIT_DIR, exist_ok=True)
+    file_name = f"plate_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.jpg"
+    save_path = os.path.join(PLATE_AUDIT_DIR, file_name)
+    
+    def write():
+        if not cv2.imwrite(save_path, plate_img):
+            logger.warning(f"Could not write plate audit image {save_path}")
+    
+    audit_executor.submit(write)
+    return save_path
 
 def format_indian_plate(text):
     """Format text as Indian license plate - NO SPACES for auto detection"""
@@ -424,189 +646,169 @@ def format_indian_plate(text):
     # Return without spaces for consistency
     return clean_text
 
-def count_fingers(hand_landmarks, hand_label):
-    """Improved finger counting with better landmark analysis"""
-    if not hand_landmarks:
-        return 0
-    
-    count = 0
-    tip_ids = [4, 8, 12, 16, 20]
-    pip_ids = [3, 6, 10, 14, 18]
-    
-    landmarks = []
-    for lm in hand_landmarks.landmark:
-        landmarks.append([lm.x, lm.y])
-    
-    # Thumb detection
-    if hand_label == "Right":
-        if landmarks[tip_ids[0]][0] < landmarks[pip_ids[0]][0]:
-            count += 1
-    else:
-        if landmarks[tip_ids[0]][0] > landmarks[pip_ids[0]][0]:
-            count += 1
-    
-    # Other four fingers
-    for i in range(1, 5):
-        if landmarks[tip_ids[i]][1] < landmarks[pip_ids[i]][1]:
-            count += 1
-    
-    return count
+def create_inference_scheduler(detection_threshold):
+    return InferenceScheduler(
+        stride=INFERENCE_STRIDE,
+        interval=INFERENCE_INTERVAL,
+        detection_threshold=detection_threshold,
+        borderline_confidence=BORDERLINE_CONFIDENCE
+    )
 
-def is_ok_sign(hand_landmarks, hand_label):
-    """Detect OK sign - thumb and index finger touching in a circle, others extended"""
-    if not hand_landmarks:
-        return False
-    
-    landmarks = []
-    for lm in hand_landmarks.landmark:
-        landmarks.append([lm.x, lm.y])
-    
-    thumb_tip = landmarks[4]
-    index_tip = landmarks[8]
-    
-    distance = ((thumb_tip[0] - index_tip[0])**2 + (thumb_tip[1] - index_tip[1])**2)**0.5
-    circle_formed = distance < 0.05
-    
-    middle_extended = landmarks[12][1] < landmarks[10][1] - 0.02
-    ring_extended = landmarks[16][1] < landmarks[14][1] - 0.02
-    pinky_extended = landmarks[20][1] < landmarks[18][1] - 0.02
-    
-    return circle_formed and middle_extended and ring_extended and pinky_extended
+def create_confirmer(required_frames=None, instant_confidence=None):
+    return DetectionConfirmer(
+        required_frames=CONFIRM_FRAMES if required_frames is None else required_frames,
+        instant_confidence=CONFIRM_CONFIDENCE if instant_confidence is None else instant_confidence
+    )
 
-def smooth_detection(current_count, previous_counts, threshold=3):
-    """Smooth detection to reduce noise"""
-    if previous_counts is None:
-        previous_counts = []
-    
-    previous_counts.append(current_count)
-    if len(previous_counts) > 5:
-        previous_counts.pop(0)
+def expand_roi(bbox, frame_shape, margin=PLATE_ROI_MARGIN):
+    """Grow a box by a margin on each side, clipped to the frame"""
+    x1, y1, x2, y2 = map(int, bbox)
+    h, w = frame_shape[:2]
+    margin_x = int((x2 - x1) * margin)
+    margin_y = int((y2 - y1) * margin)
+    return max(0, x1 - margin_x), max(0, y1 - margin_y), min(w, x2 + margin_x), min(h, y2 + margin_y)
+
+def should_annotate():
+    """Overlays are only drawn when a window is shown or a preview frame is due"""
+    return not HEADLESS or preview.wants_frame()
+
+def show_frame(window_name, frame, annotated):
+    """Send the annotated frame to the preview stream and desktop window. Returns True on ESC."""
+    if annotated and preview.wants_frame():
+        preview.publish(frame)
     
-    if len(previous_counts) >= threshold:
-        return max(set(previous_counts), key=previous_counts.count)
+    if HEADLESS:
+        return False
     
-    return current_count
+    cv2.imshow(window_name, frame)
+    return cv2.waitKey(1) & 0xFF == 27  # ESC key
+
+def record_frame_time(phase, frame_start):
+    frame_timings[phase].append(time.perf_counter() - frame_start)
+
+def close_windows():
+    if not HEADLESS:
+        cv2.destroyAllWindows()
 
-def vehicle_detection_phase():
+def vehicle_detection_phase(session):
     """Phase 1: Vehicle Detection"""
     print("Phase 1: Vehicle Detection Started")
-    detection_status['current_phase'] = "Vehicle Detection - Point camera at vehicle"
+    session.update_status(current_phase="Vehicle Detection - Point camera at vehicle")
     
-    try:
-        # Use relative path - file should be in same directory
-        model = YOLO("yolo11n.pt")
-    except Exception as e:
-        print(f"Error loading YOLO model: {e}")
+    model = model_registry.get('vehicle')
+    if model is None:
+        print("Error loading YOLO model: vehicle model not available")
         return None
     
-    cap = cv2.VideoCapture(CAMERA_ID)
-    if not cap.isOpened():
+    camera = camera_manager.acquire(session.camera_source)
+    if camera is None:
         print("Error: Could not open camera")
         return None
     
-    # Set camera to high resolution
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
-    cap.set(cv2.CAP_PROP_FPS, 30)
-    
-    # Verify if the camera accepted our resolution settings
-    actual_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-    actual_height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-    print(f"Camera resolution set to: {actual_width}x{actual_height}")
-    
     detected_class = None
-    vehicle_detected = False
-    start_time = None
+    confirmer = create_confirmer()
+    scheduler = create_inference_scheduler(0.25)
+    detections = []  # (label, confidence, bbox) from the latest inference
     
     try:
-        while True:
-            ret, frame = cap.read()
+        while not session.cancelled:
+            ret, frame = camera.read()
             if not ret:
                 break
             
-            results = model(frame, verbose=False)
-            vehicle_found = False
+            frame_start = time.perf_counter()
+            annotate = should_annotate()
+            if scheduler.should_infer():
+                with yolo_inference_seconds.time(model='vehicle'):
+                    results = model(frame, verbose=False)
+                detections = []
+                for result in results:
+                    if result.boxes is not None and len(result.boxes) > 0:
+                        for box in result.boxes:
+                            cls = int(box.cls[0])
+                            conf = float(box.conf[0])
+                            class_name = model.names[cls]
+                            
+                            if conf > 0.25 and class_name in vehicle_classes_mapping:
+                                bbox = tuple(map(int, box.xyxy[0].cpu().numpy()))
+                                detections.append((vehicle_classes_mapping[class_name], conf, bbox))
+                scheduler.update(max((conf for _, conf, _ in detections), default=0))
+            
+            # Between inferences the last detections are carried forward unchanged, not tracked
+            vehicle_found = bool(detections)
             best_conf = 0
             best_label = None
+            best_bbox = None
             
-            for result in results:
-                if result.boxes is not None and len(result.boxes) > 0:
-                    for box in result.boxes:
-                        cls = int(box.cls[0])
-                        conf = float(box.conf[0])
-                        class_name = model.names[cls]
-                        
-                        if conf > 0.25 and class_name in vehicle_classes_mapping:
-                            vehicle_found = True
-                            if conf > best_conf:
-                                best_conf = conf
-                                best_label = vehicle_classes_mapping[class_name]
-                            
-                            x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-                            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                            
-                            display_label = f"{vehicle_classes_mapping[class_name]} {conf:.2f}"
-                            (text_width, text_height), _ = cv2.getTextSize(
-                                display_label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2
-                            )
-                            
-                            cv2.rectangle(frame, (x1, y1 - text_height - 10),
-                                        (x1 + text_width, y1), (0, 255, 0), -1)
-                            cv2.putText(frame, display_label, (x1, y1 - 5),
-                                      cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+            for label, conf, (x1, y1, x2, y2) in detections:
+                if conf > best_conf:
+                    best_conf = conf
+                    best_label = label
+                    best_bbox = [x1, y1, x2, y2]
+                
+                if not annotate:
+                    continue
+                
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                
+                display_label = f"{label} {conf:.2f}"
+                (text_width, text_height), _ = cv2.getTextSize(
+                    display_label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2
+                )
+                
+                cv2.rectangle(frame, (x1, y1 - text_height - 10),
+                            (x1 + text_width, y1), (0, 255, 0), -1)
+                cv2.putText(frame, display_label, (x1, y1 - 5),
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
             
-            # Handle detection timing
+            # Confirm on consecutive inferences that agree, carried-forward frames add no evidence
             if vehicle_found:
                 detected_class = best_label
-                if not vehicle_detected:
-                    vehicle_detected = True
-                    start_time = time.time()
-                    print(f"Vehicle detected: {best_label}! Waiting 5 seconds...")
-                    detection_status['current_phase'] = f"Vehicle detected: {best_label} - Confirming..."
+            if scheduler.is_fresh:
+                confirmed = confirmer.update(best_label, best_conf)
+                if confirmer.streak == 1:
+                    print(f"Vehicle detected: {best_label}! Confirming...")
+                    session.update_status(current_phase=f"Vehicle detected: {best_label} - Confirming...")
                 
-                if start_time and time.time() - start_time >= 5:
-                    print(f"Vehicle confirmed: {best_label}")
-                    detection_results['vehicle_type'] = best_label
+                if confirmed:
+                    print(f"Vehicle confirmed: {best_label} after {confirmer.streak} inference(s)")
+                    session.set_result('vehicle_type', best_label)
+                    session.set_result('vehicle_bbox', best_bbox)
                     break
-            else:
-                vehicle_detected = False
-                start_time = None
             
-            # Add timer display
-            if vehicle_detected and start_time:
-                elapsed = time.time() - start_time
-                remaining = max(0, 5 - elapsed)
-                cv2.putText(frame, f"Confirming in: {remaining:.1f}s", (10, 30),
+            # Add confirmation progress display
+            if annotate and confirmer.streak:
+                cv2.putText(frame, f"Confirming: {confirmer.progress}", (10, 30),
                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
                 
                 if detected_class:
                     cv2.putText(frame, f"Detected: {detected_class}", (10, 60),
                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
             
-            cv2.imshow("Vehicle Detection", frame)
-            if cv2.waitKey(1) & 0xFF == 27:  # ESC key
+            record_frame_time('vehicle', frame_start)
+            if show_frame("Vehicle Detection", frame, annotate):
                 break
                 
     except Exception as e:
         print(f"Error in vehicle detection: {e}")
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        camera_manager.release(session.camera_source)
+        close_windows()
     
     return detected_class
 
-def license_plate_detection_phase():
-    """Phase 2: License Plate Detection"""
-    print("\nPhase 2: License Plate Detection Started")
-    detection_status['current_phase'] = "License Plate Detection - Point camera at license plate"
+def license_plate_detection_phase(session):
+    """Phase 2: License Plate Detection
     
-    # Use relative path - file should be in same directory
-    model_path = r"C:\Users\UseR\Documents\Coding\Smart Parking\best.pt"
+    When phase 1 found a vehicle box, the plate model only looks inside that
+    region at PLATE_INFERENCE_SIZE, and boxes are mapped back to full-frame coordinates.
+    """
+    print("\nPhase 2: License Plate Detection Started")
+    session.update_status(current_phase="License Plate Detection - Point camera at license plate")
     
-    try:
-        model = YOLO(model_path)
-    except Exception as e:
-        print(f"Error loading license plate model: {e}")
+    model = model_registry.get('plate')
+    if model is None:
+        print(f"Error loading license plate model: {model_registry.status()['plate']['error']}")
         print("Make sure 'best.pt' model file exists in your directory")
         # Generate demo license plate if model not found
         import random
@@ -617,65 +819,77 @@ def license_plate_detection_phase():
         number = random.randint(1000, 9999)
         demo_plate = f"{state}{district:02d}{series}{number}"  # No spaces
         print(f"Demo license plate generated: {demo_plate}")
-        detection_results['license_plate'] = demo_plate
-        time.sleep(3)  # Simulate processing time
+        session.set_result('license_plate', demo_plate)
         return demo_plate
     
-    cap = cv2.VideoCapture(CAMERA_ID)
-    if not cap.isOpened():
+    camera = camera_manager.acquire(session.camera_source)
+    if camera is None:
         print("Error: Could not open webcam")
         return None
     
-    # Set camera to high resolution
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
-    cap.set(cv2.CAP_PROP_FPS, 30)
-    
-    # Verify if the camera accepted our resolution settings
-    actual_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-    actual_height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-    print(f"License plate detection camera resolution: {actual_width}x{actual_height}")
-    
-    plate_detected = False
-    start_time = None
-    save_path = "detected_plate.jpg"
+    confirmer = create_confirmer()
+    plate_img = None
+    scheduler = create_inference_scheduler(0.3)
+    best_bbox = None
+    best_conf = 0
+    vehicle_bbox = session.results.get('vehicle_bbox')
+    use_roi = PLATE_ROI_ENABLED and vehicle_bbox is not None
+    roi_misses = 0
     
     try:
-        while True:
-            ret, frame = cap.read()
+        while not session.cancelled:
+            ret, frame = camera.read()
             if not ret:
                 break
             
-            results = model(frame, verbose=False)
-            plate_found = False
-            best_bbox = None
-            best_conf = 0
-            
-            if len(results) > 0 and results[0].boxes is not None:
-                boxes = results[0].boxes
-                for box in boxes:
-                    conf = float(box.conf)
-                    if conf > 0.3:
-                        plate_found = True
-                        if conf > best_conf:
+            frame_start = time.perf_counter()
+            annotate = should_annotate()
+            if scheduler.should_infer():
+                if use_roi:
+                    rx1, ry1, rx2, ry2 = expand_roi(vehicle_bbox, frame.shape)
+                    with yolo_inference_seconds.time(model='plate'):
+                        results = model(frame[ry1:ry2, rx1:rx2], imgsz=PLATE_INFERENCE_SIZE, verbose=False)
+                    offset = np.array([rx1, ry1, rx1, ry1])
+                else:
+                    with yolo_inference_seconds.time(model='plate'):
+                        results = model(frame, verbose=False)
+                    offset = 0
+                best_bbox = None
+                best_conf = 0
+                
+                if len(results) > 0 and results[0].boxes is not None:
+                    boxes = results[0].boxes
+                    for box in boxes:
+                        conf = float(box.conf)
+                        if conf > 0.3 and conf > best_conf:
                             best_conf = conf
-                            best_bbox = box.xyxy[0].cpu().numpy()
-            
-            if plate_found:
-                if not plate_detected:
-                    plate_detected = True
-                    start_time = time.time()
-                    print("License plate detected! Waiting 5 seconds...")
-                    detection_status['current_phase'] = "License plate detected - Capturing..."
+                            best_bbox = box.xyxy[0].cpu().numpy() + offset
+                scheduler.update(best_conf)
                 
-                if best_bbox is not None:
-                    x1, y1, x2, y2 = map(int, best_bbox)
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, f"Plate: {best_conf:.2f}", (x1, y1-10),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                if use_roi:
+                    roi_misses = 0 if best_bbox is not None else roi_misses + 1
+                    if roi_misses >= PLATE_ROI_MAX_MISSES:
+                        print("No plate inside the vehicle region, searching the full frame")
+                        use_roi = False
+            
+            # Between inferences the last plate box is carried forward
+            plate_found = best_bbox is not None
+            
+            if annotate and plate_found:
+                x1, y1, x2, y2 = map(int, best_bbox)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(frame, f"Plate: {best_conf:.2f}", (x1, y1-10),
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            
+            # Confirmation only happens on a fresh inference, so the crop uses a box detected on this very frame
+            if scheduler.is_fresh:
+                confirmed = confirmer.update('plate' if plate_found else None, best_conf)
+                if confirmer.streak == 1:
+                    print("License plate detected! Confirming...")
+                    session.update_status(current_phase="License plate detected - Capturing...")
                 
-                if start_time and time.time() - start_time >= 5:
-                    print("5 seconds elapsed! Capturing plate...")
+                if confirmed:
+                    print(f"License plate confirmed after {confirmer.streak} inference(s)! Capturing plate...")
                     x1, y1, x2, y2 = map(int, best_bbox)
                     h, w = frame.shape[:2]
                     padding = 30
@@ -684,154 +898,158 @@ def license_plate_detection_phase():
                     x1_pad = max(0, x1-padding)
                     x2_pad = min(w, x2+padding)
                     
-                    plate_img = frame[y1_pad:y2_pad, x1_pad:x2_pad]
-                    cv2.imwrite(save_path, plate_img)
+                    # Copy so the crop owns its pixels independently of the frame buffer
+                    plate_img = frame[y1_pad:y2_pad, x1_pad:x2_pad].copy()
+                    save_plate_audit_image(plate_img)
                     break
-            else:
-                plate_detected = False
-                start_time = None
             
-            if plate_detected and start_time:
-                elapsed = time.time() - start_time
-                remaining = max(0, 5 - elapsed)
-                cv2.putText(frame, f"Capturing in: {remaining:.1f}s", (10, 30),
+            if annotate and confirmer.streak:
+                cv2.putText(frame, f"Capturing: {confirmer.progress}", (10, 30),
                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
             
-            cv2.imshow("License Plate Detection", frame)
-            if cv2.waitKey(1) & 0xFF == 27:
+            record_frame_time('plate', frame_start)
+            if show_frame("License Plate Detection", frame, annotate):
                 break
                 
     except Exception as e:
         print(f"Error in license plate detection: {e}")
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        camera_manager.release(session.camera_source)
+        close_windows()
     
-    # Process saved image with OCR
-    if os.path.exists(save_path):
+    # Process captured crop with OCR
+    if plate_img is not None:
         print("Processing license plate...")
-        detection_status['current_phase'] = "Processing license plate text..."
-        detection_status['message'] = "Analyzing license plate image with OCR..."
+        session.update_status(
+            current_phase="Processing license plate text...",
+            message="Analyzing license plate image with OCR..."
+        )
         
         try:
-            plate_img = cv2.imread(save_path)
             results = process_license_plate_ocr(plate_img)
             if results:
                 best_text = results[0][0]
                 formatted_plate = format_indian_plate(best_text)
-                detection_results['license_plate'] = formatted_plate
-                detection_status['current_phase'] = "License plate processed successfully"
-                detection_status['message'] = f"License plate detected: {formatted_plate}"
+                session.set_result('license_plate', formatted_plate)
+                plate_ocr_total.inc(outcome='success')
+                session.update_status(
+                    current_phase="License plate processed successfully",
+                    message=f"License plate detected: {formatted_plate}"
+                )
                 print(f"✓ License plate processed: {formatted_plate}")
                 return formatted_plate
             else:
-                detection_status['current_phase'] = "License plate text not readable"
-                detection_status['message'] = "Could not extract text from license plate"
+                plate_ocr_total.inc(outcome='failure')
+                session.update_status(
+                    current_phase="License plate text not readable",
+                    message="Could not extract text from license plate"
+                )
                 print("✗ No readable text found in license plate")
         except Exception as e:
             print(f"Error processing OCR: {e}")
-            detection_status['current_phase'] = "OCR processing error"
-            detection_status['message'] = f"Error processing license plate: {str(e)}"
+            plate_ocr_total.inc(outcome='failure')
+            session.update_status(
+                current_phase="OCR processing error",
+                message=f"Error processing license plate: {str(e)}"
+            )
     else:
-        detection_status['current_phase'] = "No license plate image captured"
-        detection_status['message'] = "Failed to capture license plate image"
+        session.update_status(
+            current_phase="No license plate image captured",
+            message="Failed to capture license plate image"
+        )
         print("✗ No license plate image found")
     
     return None
 
-def hand_gesture_detection_phase():
+def hand_gesture_detection_phase(session):
     """Phase 3: Hand Gesture Detection for Hours"""
     if not MP_AVAILABLE:
         print("MediaPipe not available. Using default parking hours.")
-        detection_status['current_phase'] = "Hand gesture detection not available"
-        detection_status['message'] = "Using default 2 hours parking duration"
+        session.update_status(
+            current_phase="Hand gesture detection not available",
+            message="Using default 2 hours parking duration"
+        )
         # For demonstration, return a default value
         default_hours = 2
-        detection_results['parking_hours'] = default_hours
-        time.sleep(3)  # Simulate processing time
+        session.set_result('parking_hours', default_hours)
         return default_hours
     
     print("\nPhase 3: Hand Gesture Detection Started")
-    detection_status['current_phase'] = "Hand Gesture Detection - Show fingers (1-10) for parking hours"
+    session.update_status(current_phase="Hand Gesture Detection - Show fingers (1-10) for parking hours")
     
-    # Initialize MediaPipe
     mp_hands = mp.solutions.hands
     mp_draw = mp.solutions.drawing_utils
-    hands = mp_hands.Hands(
-        static_image_mode=False,
-        max_num_hands=2,
-        min_detection_confidence=0.8,
-        min_tracking_confidence=0.7,
-        model_complexity=1
-    )
     
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
+    tracker = hand_trackers.acquire()
+    camera = camera_manager.acquire(session.camera_source)
+    if camera is None:
         print("Error: Could not open camera")
+        hand_trackers.release(tracker)
         return None
     
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-    cap.set(cv2.CAP_PROP_FPS, 30)
-    
-    previous_counts = []
-    current_number = 0
-    number_start_time = None
-    number_display_duration = 3.0
+    finger_smoother = VoteSmoother(window=5, min_votes=3)
+    number_confirmer = create_confirmer(required_frames=GESTURE_CONFIRM_FRAMES, instant_confidence=float('inf'))
     confirmation_mode = False
     confirmed_number = 0
     ok_gesture_counter = 0
     ok_gesture_threshold = 8
     
     try:
-        while True:
-            ret, frame = cap.read()
+        while not session.cancelled:
+            ret, frame = camera.read()
             if not ret:
                 break
             
-            frame = cv2.flip(frame, 1)
+            frame_start = time.perf_counter()
+            annotate = should_annotate()
+            results = tracker.process(frame)
+            # The full-size frame is only mirrored when it is going to be shown
+            if annotate:
+                frame = cv2.flip(frame, 1)
             h, w, _ = frame.shape
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(frame_rgb)
             
             total_fingers = 0
             ok_detected = False
             
             if results.multi_hand_landmarks and results.multi_handedness:
-                for hand_landmarks, hand_handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    hand_label = hand_handedness.classification[0].label
-                    confidence = hand_handedness.classification[0].score
-                    
-                    mp_draw.draw_landmarks(
-                        frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                        mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                        mp_draw.DrawingSpec(color=(255, 0, 0), thickness=2)
-                    )
-                    
-                    cv2.putText(frame, f'{hand_label} ({confidence:.2f})',
-                              (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
-                    
-                    if is_ok_sign(hand_landmarks, hand_label):
-                        ok_detected = True
-                    
-                    if not confirmation_mode:
-                        fingers = count_fingers(hand_landmarks, hand_label)
-                        total_fingers += fingers
+                hand_labels = [handedness.classification[0].label for handedness in results.multi_handedness]
+                
+                # Finger counts and OK signs for all hands of the frame in one batch
+                finger_counts, ok_signs = analyze_hands(landmarks_to_array(results.multi_hand_landmarks), hand_labels)
+                ok_detected = bool(ok_signs.any())
+                if not confirmation_mode:
+                    total_fingers = int(finger_counts.sum())
+                
+                if annotate:
+                    for hand_landmarks, hand_handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                        hand_label = hand_handedness.classification[0].label
+                        confidence = hand_handedness.classification[0].score
+                        mp_draw.draw_landmarks(
+                            frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
+                            mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+                            mp_draw.DrawingSpec(color=(255, 0, 0), thickness=2)
+                        )
+                        
+                        cv2.putText(frame, f'{hand_label} ({confidence:.2f})',
+                                  (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
             
             # Handle OK gesture detection
             if ok_detected and confirmation_mode:
                 ok_gesture_counter += 1
                 remaining = ok_gesture_threshold - ok_gesture_counter + 1
-                cv2.putText(frame, 'OK SIGN DETECTED!', (50, 200),
-                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 128, 0), 3)
-                cv2.putText(frame, f'Confirming in {remaining}...', (50, 240),
-                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 100, 0), 3)
+                if annotate:
+                    cv2.putText(frame, 'OK SIGN DETECTED!', (50, 200),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 128, 0), 3)
+                    cv2.putText(frame, f'Confirming in {remaining}...', (50, 240),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 100, 0), 3)
                 
                 if ok_gesture_counter >= ok_gesture_threshold:
                     print(f'Parking hours confirmed: {confirmed_number}')
-                    detection_results['parking_hours'] = confirmed_number
-                    detection_status['current_phase'] = f"Parking duration confirmed: {confirmed_number} hours"
-                    detection_status['message'] = f"Hand gesture detection completed successfully"
+                    session.set_result('parking_hours', confirmed_number)
+                    session.update_status(
+                        current_phase=f"Parking duration confirmed: {confirmed_number} hours",
+                        message=f"Hand gesture detection completed successfully"
+                    )
                     break
             else:
                 ok_gesture_counter = 0
@@ -845,102 +1063,97 @@ def hand_gesture_detection_phase():
                     total_fingers = 0
                 
                 # Smooth the finger count
-                total_fingers = smooth_detection(total_fingers, previous_counts)
+                total_fingers = finger_smoother.update(total_fingers)
                 
-                # Check if number has changed
-                if total_fingers != current_number:
-                    current_number = total_fingers
-                    number_start_time = time.time()
-                
-                # Check if same number has been displayed for required duration
-                if number_start_time and (time.time() - number_start_time) >= number_display_duration:
-                    if current_number > 0:  # Only confirm if 1-10 hours
-                        confirmation_mode = True
-                        confirmed_number = current_number
-                        print(f"Number {confirmed_number} detected for 3 seconds! Please confirm with OK gesture.")
-                        detection_status['current_phase'] = f"Confirm {confirmed_number} hours with OK gesture"
-                        detection_status['message'] = f"Hold OK gesture to confirm {confirmed_number} hours parking duration"
+                # Confirm once the same number is shown on enough consecutive frames, only 1-10 hours count
+                if number_confirmer.update(total_fingers if total_fingers > 0 else None):
+                    confirmation_mode = True
+                    confirmed_number = total_fingers
+                    print(f"Number {confirmed_number} held for {number_confirmer.streak} frames! Please confirm with OK gesture.")
+                    session.update_status(
+                        current_phase=f"Confirm {confirmed_number} hours with OK gesture",
+                        message=f"Hold OK gesture to confirm {confirmed_number} hours parking duration"
+                    )
                 
                 # Display current finger count
-                cv2.putText(frame, f'Hours: {total_fingers}', (50, 100),
-                          cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 139), 4)
+                if annotate:
+                    cv2.putText(frame, f'Hours: {total_fingers}', (50, 100),
+                              cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 139), 4)
                 
-                # Show countdown if number is stable
-                if number_start_time and current_number > 0:
-                    elapsed = time.time() - number_start_time
-                    remaining = max(0, number_display_duration - elapsed)
-                    if remaining > 0:
-                        cv2.putText(frame, f'Stable for {elapsed:.1f}s / {number_display_duration}s',
-                                  (50, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (25, 25, 112), 2)
+                # Show how long the number has been stable
+                if annotate and number_confirmer.streak and not confirmation_mode:
+                    cv2.putText(frame, f'Stable for {number_confirmer.progress} frames',
+                              (50, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (25, 25, 112), 2)
             
             elif confirmation_mode:
                 # Display confirmation message
-                cv2.putText(frame, f'Is the duration {confirmed_number} hours?', (50, 100),
-                          cv2.FONT_HERSHEY_SIMPLEX, 1.2, (139, 0, 0), 3)
-                cv2.putText(frame, 'Show OK gesture to confirm', (50, 150),
-                          cv2.FONT_HERSHEY_SIMPLEX, 1, (128, 0, 128), 3)
+                if annotate:
+                    cv2.putText(frame, f'Is the duration {confirmed_number} hours?', (50, 100),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1.2, (139, 0, 0), 3)
+                    cv2.putText(frame, 'Show OK gesture to confirm', (50, 150),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (128, 0, 128), 3)
             
             elif not results.multi_hand_landmarks:
-                cv2.putText(frame, 'Show your hand(s) (1-10 fingers)', (50, 100),
-                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 128), 3)
-                current_number = 0
-                number_start_time = None
+                if annotate:
+                    cv2.putText(frame, 'Show your hand(s) (1-10 fingers)', (50, 100),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 128), 3)
+                number_confirmer.reset()
             
             # Display instructions
-            if not confirmation_mode:
-                cv2.putText(frame, 'Hold same number for 3 seconds to confirm',
-                          (10, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
-            else:
-                cv2.putText(frame, 'Use OK gesture (thumb+index circle) to confirm',
-                          (10, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+            if annotate:
+                if not confirmation_mode:
+                    cv2.putText(frame, 'Hold the same number steady to confirm',
+                              (10, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+                else:
+                    cv2.putText(frame, 'Use OK gesture (thumb+index circle) to confirm',
+                              (10, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
             
-            cv2.putText(frame, 'Press ESC to quit', (10, h - 20),
-                      cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+                cv2.putText(frame, 'Press ESC to quit', (10, h - 20),
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
             
-            cv2.imshow("Hand Gesture - Parking Hours", frame)
-            if cv2.waitKey(1) & 0xFF == 27:
+            record_frame_time('gesture', frame_start)
+            if show_frame("Hand Gesture - Parking Hours", frame, annotate):
                 break
                 
     except Exception as e:
         print(f"Error in hand gesture detection: {e}")
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        hand_trackers.release(tracker)
+        camera_manager.release(session.camera_source)
+        close_windows()
     
-    return detection_results.get('parking_hours')
+    return session.results.get('parking_hours')
 
-def run_detection():
+def run_detection(session):
     """Main detection function that runs all three phases"""
-    global detection_status, detection_results
-    
     try:
-        detection_status['status'] = 'running'
-        detection_status['message'] = 'Starting detection process...'
-        logger.info("Starting AI detection process")
+        session.update_status(status='running', message='Starting detection process...')
+        logger.info(f"Starting AI detection process for session {session.id} on camera {session.camera_source}")
         
-        # Reset results
-        detection_results = {
-            'vehicle_type': None,
-            'license_plate': None,
-            'parking_hours': None
-        }
+        # Keep the camera open across all three phases
+        camera_manager.acquire(session.camera_source)
         
         # Phase 1: Vehicle Detection
+        camera = str(session.camera_source)
         logger.info("Starting Phase 1: Vehicle Detection")
-        vehicle_type = vehicle_detection_phase()
+        with phase_duration_seconds.time(phase='vehicle', camera=camera):
+            vehicle_type = vehicle_detection_phase(session)
+        if session.cancelled:
+            return
         if not vehicle_type:
-            detection_status['status'] = 'error'
-            detection_status['message'] = 'Vehicle detection failed'
+            session.update_status(status='error', message='Vehicle detection failed')
             logger.error("Vehicle detection failed")
             return
         
         print(f"✓ Phase 1 Complete: {vehicle_type}")
         logger.info(f"Phase 1 completed: {vehicle_type}")
-        time.sleep(2)
         
         # Phase 2: License Plate Detection
         logger.info("Starting Phase 2: License Plate Detection")
-        license_plate = license_plate_detection_phase()
+        with phase_duration_seconds.time(phase='plate', camera=camera):
+            license_plate = license_plate_detection_phase(session)
+        if session.cancelled:
+            return
         if license_plate:
             print(f"✓ Phase 2 Complete: {license_plate}")
             logger.info(f"Phase 2 completed: {license_plate}")
@@ -948,14 +1161,17 @@ def run_detection():
             print("✗ Phase 2 Failed: License plate not detected")
             logger.warning("License plate detection failed, continuing to next phase")
             # Continue to next phase even if license plate detection fails
-            detection_status['current_phase'] = "License plate detection failed - continuing to hand gesture"
-            detection_status['message'] = "Will proceed with manual license plate entry"
-        
-        time.sleep(2)
+            session.update_status(
+                current_phase="License plate detection failed - continuing to hand gesture",
+                message="Will proceed with manual license plate entry"
+            )
         
         # Phase 3: Hand Gesture Detection
         logger.info("Starting Phase 3: Hand Gesture Detection")
-        parking_hours = hand_gesture_detection_phase()
+        with phase_duration_seconds.time(phase='gesture', camera=camera):
+            parking_hours = hand_gesture_detection_phase(session)
+        if session.cancelled:
+            return
         if parking_hours:
             print(f"✓ Phase 3 Complete: {parking_hours} hours")
             logger.info(f"Phase 3 completed: {parking_hours} hours")
@@ -964,87 +1180,206 @@ def run_detection():
             logger.warning("Hand gesture detection failed, using default 2 hours")
             # Use default parking hours if gesture detection fails
             parking_hours = 2
-            detection_results['parking_hours'] = parking_hours
-            detection_status['current_phase'] = "Hand gesture detection failed - using default 2 hours"
-            detection_status['message'] = "Default 2-hour parking duration applied"
+            session.set_result('parking_hours', parking_hours)
+            session.update_status(
+                current_phase="Hand gesture detection failed - using default 2 hours",
+                message="Default 2-hour parking duration applied"
+            )
         
-        detection_status['status'] = 'completed'
-        detection_status['current_phase'] = 'Detection completed'
-        detection_status['message'] = 'All detection phases completed'
+        session.update_status(
+            status='completed', current_phase='Detection completed',
+            message='All detection phases completed'
+        )
         logger.info("All detection phases completed successfully")
         
     except Exception as e:
-        detection_status['status'] = 'error'
-        detection_status['message'] = str(e)
+        handle_detection_error(session, str(e))
         print(f"Error during detection: {e}")
+    finally:
+        camera_manager.release(session.camera_source)
+
+# Each /start_detection gets its own session, run on a bounded worker pool
+session_manager = SessionManager(run_detection, max_workers=MAX_SESSIONS, max_queued=MAX_QUEUED_SESSIONS)
+
+def camera_frame_counts(key):
+    return lambda: {(camera,): counts[key] for camera, counts in camera_manager.totals().items()}
+
+def camera_drop_ratio():
+    return {
+        (camera,): counts['frames_dropped'] / counts['frames_captured'] if counts['frames_captured'] else 0.0
+        for camera, counts in camera_manager.totals().items()
+    }
+
+metrics.gauge('sessions_in_flight', 'Detection sessions queued or running',
+              function=lambda: {(): session_manager.active_count()})
+metrics.counter('camera_frames_captured_total', 'Frames read from each camera', ('camera',),
+                function=camera_frame_counts('frames_captured'))
+metrics.counter('camera_frames_dropped_total', 'Frames overwritten before any phase consumed them', ('camera',),
+                function=camera_frame_counts('frames_dropped'))
+metrics.gauge('camera_frame_drop_ratio', 'Share of captured frames dropped since startup', ('camera',),
+              function=camera_drop_ratio)
+
+def idle_response():
+    return {
+        'session_id': None,
+        'status': 'idle',
+        'current_phase': None,
+        'message': None,
+        'results': empty_results()
+    }
+
+def find_session(session_id):
+    """Look up a session by id, or the most recent session when no id is given"""
+    if session_id is None:
+        return session_manager.latest()
+    return session_manager.get(session_id)
 
 # Flask API Routes
 @app.route('/start_detection', methods=['POST'])
 def start_detection():
-    global detection_status
+    payload = request.get_json(silent=True) or {}
+    camera_source = CAMERA_ID
+    if 'camera' in payload:
+        # Only configured cameras, a client must never choose a file path or URL to open
+        camera_source = CAMERA_SOURCES.get(str(payload['camera']).strip())
+        if camera_source is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Unknown camera, only cameras configured with CAMERA_ID or CAMERA_SOURCES can be used'
+            }), 400
+    
+    session, outcome = session_manager.start(camera_source)
+    if outcome == 'busy':
+        return jsonify({
+            'status': 'busy',
+            'message': 'All detection workers are busy, try again shortly'
+        }), 503
     
-    if detection_status['status'] == 'running':
+    if outcome == 'already_running':
         return jsonify({
             'status': 'already_running',
+            'session_id': session.id,
             'message': 'Detection is already in progress'
         })
     
-    # Start detection in a separate thread
-    detection_thread = threading.Thread(target=run_detection)
-    detection_thread.daemon = True
-    detection_thread.start()
-    
     return jsonify({
         'status': 'started',
+        'session_id': session.id,
         'message': 'Detection process started'
     })
 
 @app.route('/get_results', methods=['GET'])
-def get_results():
-    return jsonify({
-        'status': detection_status['status'],
-        'current_phase': detection_status.get('current_phase'),
-        'message': detection_status.get('message'),
-        'results': detection_results
+@app.route('/get_results/<session_id>', methods=['GET'])
+def get_results(session_id=None):
+    session = find_session(session_id)
+    if session is None:
+        if session_id is not None:
+            return jsonify({'status': 'not_found', 'message': f'Unknown session {session_id}'}), 404
+        return jsonify(idle_response())
+    
+    # Long-poll: with ?since=<version>, hold the request until the session state moves past that version
+    since = request.args.get('since', type=int)
+    if since is not None:
+        wait = min(request.args.get('wait', LONG_POLL_TIMEOUT, type=float), LONG_POLL_TIMEOUT)
+        snapshot = session.store.wait_for_change(since, timeout=wait)
+        if snapshot is not None:
+            return jsonify(session.to_dict(snapshot))
+    
+    return jsonify(session.to_dict())
+
+def session_events(session):
+    """Server-Sent Events stream of a session's state, one event per version until it finishes"""
+    snapshot = session.store.snapshot()
+    while True:
+        state = session.to_dict(snapshot)
+        yield f"id: {state['version']}\nevent: state\ndata: {json.dumps(state)}\n\n"
+        if state['status'] not in session.ACTIVE_STATUSES:
+            return
+        
+        version = state['version']
+        snapshot = None
+        while snapshot is None:
+            snapshot = session.store.wait_for_change(version, timeout=EVENTS_KEEPALIVE)
+            if snapshot is None:
+                yield ": keep-alive\n\n"
+
+@app.route('/events', methods=['GET'])
+@app.route('/events/<session_id>', methods=['GET'])
+def detection_events(session_id=None):
+    """Push phase and result updates as they happen instead of polling /get_results"""
+    session = find_session(session_id)
+    if session is None:
+        return jsonify({'status': 'not_found', 'message': f'Unknown session {session_id}'}), 404
+    
+    return Response(session_events(session), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
 @app.route('/reset', methods=['POST'])
-def reset_detection():
-    global detection_status, detection_results
+@app.route('/reset/<session_id>', methods=['POST'])
+def reset_detection(session_id=None):
+    session = find_session(session_id)
+    if session is None and session_id is not None:
+        return jsonify({'status': 'not_found', 'message': f'Unknown session {session_id}'}), 404
     
-    detection_status = {
-        'status': 'idle',
-        'current_phase': None,
-        'message': None
-    }
-    
-    detection_results = {
-        'vehicle_type': None,
-        'license_plate': None,
-        'parking_hours': None
-    }
+    if session is not None:
+        session_manager.reset(session.id)
+        logger.info(f"Detection session {session.id} reset")
     
-    logger.info("Detection system reset")
     return jsonify({
         'status': 'reset',
+        'session_id': session.id if session else None,
         'message': 'Detection system reset'
     })
 
+@app.route('/preview', methods=['GET'])
+def preview_stream():
+    """MJPEG stream of the annotated detection frames"""
+    return Response(preview.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    latest = session_manager.latest()
     return jsonify({
         'status': 'healthy',
         'timestamp': time.time(),
-        'detection_status': detection_status['status'],
+        'detection_status': latest.status['status'] if latest else 'idle',
+        'active_sessions': session_manager.active_count(),
         'camera_available': True,  # Could add actual camera check
-        'models_loaded': True  # Could add actual model check
+        'cameras': camera_manager.stats(),
+        'models_loaded': model_registry.all_loaded(),
+        'models': model_registry.status(),
+        'ocr_cache': ocr_cache.stats()
     })
 
+def shutdown_server():
+    """Stop detection sessions and release cameras and worker pools, safe to call more than once"""
+    logger.info("Shutting down detection server")
+    session_manager.shutdown()
+    camera_manager.release_all()
+    ocr_executor.shutdown(wait=False, cancel_futures=True)
+    audit_executor.shutdown(wait=True)
+    if MP_AVAILABLE:
+        hand_trackers.close()
+    close_windows()
+
 if __name__ == '__main__':
     print("Smart Parking Detection Server Starting...")
     print("Make sure to have your YOLO models ready:")
     print("1. yolo11n.pt (for vehicle detection) - will be downloaded automatically")
     print("2. best.pt (for license plate detection) - place in same directory")
     print("Server will run on http://localhost:8000")
-    app.run(host='localhost', port=8000, debug=False)
+    print("Loading detection models...")
+    print("For production use run `python wsgi.py` instead of the Flask development server")
+    model_registry.load_all()
+    try:
+        app.run(host='localhost', port=PORT, debug=False, threaded=True)
+    finally:
+        shutdown_server()
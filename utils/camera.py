@@ -0,0 +1,353 @@
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+def parse_camera_source(value):
+    """Webcam indices are given as digits, anything else is a video file or image directory path"""
+    value = str(value).strip()
+    return int(value) if value.isdigit() else value
+
+
+def parse_camera_allow_list(value: str, default) -> Dict[str, object]:
+    """Camera names a client may ask for, mapped to their sources.
+
+    ``value`` is a comma separated list of ``name=source`` pairs, a bare source
+    is allowed under its own name. The default camera is always allowed, both
+    as ``default`` and under its own name.
+    """
+    cameras = {'default': default, str(default): default}
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        name, _, source = entry.partition('=') if '=' in entry else (entry, '', entry)
+        cameras[name.strip()] = parse_camera_source(source)
+    return cameras
+
+
+class ReplaySource:
+    """Base for recorded frame sources with a ``cv2.VideoCapture``-like interface.
+
+    With ``realtime`` set, frames are released at the recording's frame rate like a
+    live camera, otherwise they are returned as fast as they are read.
+    """
+
+    def __init__(self, fps: float, realtime: bool):
+        self.fps = fps if fps and fps > 0 else 30
+        self.realtime = realtime
+        self._next_frame_time = None
+
+    def _throttle(self) -> None:
+        if not self.realtime:
+            return
+        now = time.monotonic()
+        if self._next_frame_time is None:
+            self._next_frame_time = now
+        elif self._next_frame_time > now:
+            time.sleep(self._next_frame_time - now)
+        self._next_frame_time = max(now, self._next_frame_time) + 1.0 / self.fps
+
+    def set(self, prop_id, value) -> bool:
+        # Recorded frames keep their own resolution
+        return False
+
+
+class VideoFileSource(ReplaySource):
+    """Replays a video file such as an MP4 recording"""
+
+    def __init__(self, path: str, realtime: bool = True):
+        self._cap = cv2.VideoCapture(path)
+        super().__init__(self._cap.get(cv2.CAP_PROP_FPS), realtime)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def read(self):
+        self._throttle()
+        return self._cap.read()
+
+    def get(self, prop_id):
+        return self._cap.get(prop_id)
+
+    def release(self) -> None:
+        self._cap.release()
+
+
+class ImageDirectorySource(ReplaySource):
+    """Replays a directory of still images in file name order"""
+
+    def __init__(self, directory: str, fps: float = 30, realtime: bool = True):
+        super().__init__(fps, realtime)
+        self._paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        self._index = 0
+        self._shape = None
+
+    def isOpened(self) -> bool:
+        return bool(self._paths)
+
+    def read(self):
+        while self._index < len(self._paths):
+            path = self._paths[self._index]
+            self._index += 1
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                self._shape = frame.shape
+                self._throttle()
+                return True, frame
+        return False, None
+
+    def get(self, prop_id):
+        if self._shape is None:
+            return 0
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return self._shape[1]
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self._shape[0]
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0
+
+    def release(self) -> None:
+        self._paths = []
+
+
+def open_frame_source(source, realtime: bool = True, replay_fps: float = 30):
+    """Open a webcam index, video file or image directory"""
+    if isinstance(source, int):
+        return cv2.VideoCapture(source)
+    if os.path.isdir(source):
+        return ImageDirectorySource(source, fps=replay_fps, realtime=realtime)
+    return VideoFileSource(source, realtime=realtime)
+
+
+class CameraStream:
+    """Reads frames from a camera on a dedicated thread.
+
+    Only the newest ``buffer_size`` frames are kept, so consumers always work on
+    the most recent frame instead of whatever piled up in the driver buffer while
+    inference was running. Recordings replayed faster than real time wait for
+    each frame to be consumed instead, so no frame is skipped.
+    """
+
+    def __init__(self, source, width: int, height: int, fps: int = 30, buffer_size: int = 2,
+                 realtime: bool = True):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.realtime = realtime
+        self.wait_for_consumer = not realtime and not isinstance(source, int)
+        self._frames = deque(maxlen=buffer_size)  # [sequence number, frame, consumed]
+        self._condition = threading.Condition()
+        self._last_read = {}  # consumer thread id -> last sequence number returned
+        self._thread = None
+        self._running = False
+        self._cap = None
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+    def start(self) -> bool:
+        """Open the camera and start the capture thread. Returns False if the camera cannot be opened."""
+        if self._running:
+            return True
+
+        self._cap = open_frame_source(self.source, realtime=self.realtime, replay_fps=self.fps)
+        if not self._cap.isOpened():
+            print(f"Error: Could not open camera {self.source}")
+            return False
+
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        # Keep the driver queue short, the ring buffer does the buffering
+        self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        actual_width = self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        actual_height = self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        print(f"Camera {self.source} resolution set to: {actual_width}x{actual_height}")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name=f"camera-{self.source}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _capture_loop(self) -> None:
+        while self._running:
+            if self.wait_for_consumer:
+                with self._condition:
+                    self._condition.wait_for(lambda: not self._running or not self._frames or self._frames[-1][2])
+            ret, frame = self._cap.read()
+            if not ret:
+                break
+            with self._condition:
+                # Count frames that fall out of the buffer without ever being read
+                if len(self._frames) == self._frames.maxlen and not self._frames[0][2]:
+                    self.frames_dropped += 1
+                self.frames_captured += 1
+                self._frames.append([self.frames_captured, frame, False])
+                self._condition.notify_all()
+
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def read(self, timeout: float = 2.0) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the newest frame not yet seen by the calling thread, like ``cv2.VideoCapture.read``.
+
+        Several consumers can read the same buffered frame, so each gets its own
+        copy and may draw on it freely.
+        """
+        consumer = threading.get_ident()
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                last_seq = self._last_read.get(consumer, 0)
+                if self._frames and self._frames[-1][0] > last_seq:
+                    entry = self._frames[-1]
+                    seq, frame = entry[0], entry[1]
+                    entry[2] = True
+                    self._last_read[consumer] = seq
+                    self._condition.notify_all()
+                    return True, frame.copy()
+                remaining = deadline - time.monotonic()
+                if not self._running or remaining <= 0:
+                    return False, None
+                self._condition.wait(remaining)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        with self._condition:
+            self._frames.clear()
+            self._last_read.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_dropped': self.frames_dropped
+        }
+
+
+class CameraManager:
+    """Shares one CameraStream per camera across detection phases.
+
+    Streams are reference counted: the camera stays open while any phase or
+    detection run holds it, and is released when the last holder lets go.
+    Opening and closing a camera can take seconds, so it happens under a lock
+    for that camera only, never under the manager-wide lock.
+    """
+
+    def __init__(self, width: int, height: int, fps: int = 30, buffer_size: int = 2, realtime: bool = True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.realtime = realtime
+        self._streams = {}
+        self._refcounts = {}
+        self._closed_totals = {}  # Frame counts of streams that have been stopped, per camera
+        self._source_locks = {}  # Serializes opening and closing of each camera
+        self._lock = threading.Lock()  # Guards the dicts above, never held while a camera opens or stops
+
+    def acquire(self, source) -> Optional[CameraStream]:
+        """Return a running stream for the camera, opening it on first use"""
+        with self._lock:
+            self._refcounts[source] = self._refcounts.get(source, 0) + 1
+            source_lock = self._source_locks.setdefault(source, threading.Lock())
+
+        with source_lock:
+            with self._lock:
+                stream = self._streams.get(source)
+                if stream is not None and stream.is_running:
+                    return stream
+                self._streams.pop(source, None)
+            if stream is not None:
+                self._stop(source, stream)
+
+            stream = CameraStream(source, self.width, self.height, self.fps, self.buffer_size,
+                                  realtime=self.realtime)
+            started = stream.start()
+            with self._lock:
+                if started:
+                    self._streams[source] = stream
+                    return stream
+                self._drop_reference(source)
+            return None
+
+    def release(self, source) -> None:
+        """Drop one reference, closing the camera when nobody holds it any more"""
+        with self._lock:
+            if source not in self._refcounts or self._drop_reference(source) > 0:
+                return
+            source_lock = self._source_locks[source]
+
+        with source_lock:
+            with self._lock:
+                if self._refcounts.get(source):
+                    # Acquired again while we waited, keep it open
+                    return
+                stream = self._streams.pop(source, None)
+            if stream is not None:
+                self._stop(source, stream)
+
+    def release_all(self) -> None:
+        with self._lock:
+            streams = list(self._streams.items())
+            self._streams.clear()
+            self._refcounts.clear()
+        for source, stream in streams:
+            self._stop(source, stream)
+
+    def _drop_reference(self, source) -> int:
+        """Decrement the reference count, call with the manager lock held"""
+        count = self._refcounts.get(source, 0) - 1
+        if count > 0:
+            self._refcounts[source] = count
+        else:
+            self._refcounts.pop(source, None)
+        return count
+
+    def _stop(self, source, stream: CameraStream) -> None:
+        """Stop a stream and keep its frame counts, call without the manager lock"""
+        stream.stop()
+        with self._lock:
+            totals = self._closed_totals.setdefault(source, {'frames_captured': 0, 'frames_dropped': 0})
+            for key, value in stream.stats().items():
+                totals[key] += value
+
+    def is_open(self, source) -> bool:
+        stream = self._streams.get(source)
+        return stream is not None and stream.is_running
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {str(source): stream.stats() for source, stream in self._streams.items()}
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        """Frames captured and dropped per camera since startup, including closed streams"""
+        with self._lock:
+            totals = {source: dict(counts) for source, counts in self._closed_totals.items()}
+            for source, stream in self._streams.items():
+                counts = totals.setdefault(source, {'frames_captured': 0, 'frames_dropped': 0})
+                for key, value in stream.stats().items():
+                    counts[key] += value
+        return {str(source): counts for source, counts in totals.items()}
@@ -0,0 +1,37 @@
+from typing import Hashable, Optional
+
+
+class DetectionConfirmer:
+    """Confirms a detection once consecutive observations agree on it.
+
+    Call ``update`` with the label seen on each new observation (a fresh
+    inference, or a processed frame), or None when nothing was seen. A
+    detection is confirmed after ``required_frames`` agreeing observations in
+    a row, or at once when one reaches ``instant_confidence``.
+    """
+
+    def __init__(self, required_frames: int = 5, instant_confidence: float = 1.01):
+        self.required_frames = max(1, required_frames)
+        self.instant_confidence = instant_confidence
+        self.label = None
+        self.streak = 0
+
+    def update(self, label: Optional[Hashable], confidence: float = 0.0) -> bool:
+        """Record one observation, returns True when the label is confirmed"""
+        if label is None:
+            self.reset()
+            return False
+        if label == self.label:
+            self.streak += 1
+        else:
+            self.label = label
+            self.streak = 1
+        return self.streak >= self.required_frames or confidence >= self.instant_confidence
+
+    def reset(self) -> None:
+        self.label = None
+        self.streak = 0
+
+    @property
+    def progress(self) -> str:
+        return f"{min(self.streak, self.required_frames)}/{self.required_frames}"
@@ -1,31 +1,239 @@
+import copy
 import json
 import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import datetime
 
+from utils.file_lock import FileLock, write_json_atomic
+from utils.journal import ParkingJournal
+from utils.slot import Slot, slots_from_dicts, slots_to_dicts
+from utils.sqlite_store import SQLiteStore
+
+# json rewrites parking_data.json on every save, journal appends changed slots to a log,
+# sqlite keeps slots, completed stays and holidays in data/parking.db
+PARKING_STORAGE = os.getenv('PARKING_STORAGE', 'json')
+JOURNAL_COMPACT_EVERY = int(os.getenv('JOURNAL_COMPACT_EVERY', 500))  # Log records before they are folded into a snapshot
+JOURNAL_FSYNC_EVERY = int(os.getenv('JOURNAL_FSYNC_EVERY', 8))
+JOURNAL_FSYNC_INTERVAL = float(os.getenv('JOURNAL_FSYNC_INTERVAL', 1.0))
+
+class SaveConflictError(Exception):
+    """A save overlapped with changes another session made to the same slots"""
+    
+    def __init__(self, message: str, slots: Optional[List[int]] = None):
+        super().__init__(message)
+        self.slots = slots or []
+
 class DataManager:
-    def __init__(self):
+    # Slots of recent versions, kept as the common ancestor when merging a stale save.
+    # Shared by every instance in the process, since sessions load and save through different instances.
+    MAX_BASE_VERSIONS = 32
+    _base_versions: Dict[str, OrderedDict] = {}
+    
+    def __init__(self, storage: str = PARKING_STORAGE):
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
         self.parking_file = self.data_dir / "parking_data.json"
         self.holidays_file = self.data_dir / "holidays.json"
+        self.lock_file = self.data_dir / "parking_data.lock"
+        self.version_file = self.data_dir / "parking_data.version"
+        self.storage = storage
+        
+        # In journal mode parking_data.json is the snapshot and the log holds the changes made since
+        self.journal = None
+        if storage == 'journal':
+            self.journal = ParkingJournal(
+                self.data_dir / "parking_journal.log",
+                fsync_every=JOURNAL_FSYNC_EVERY,
+                fsync_interval=JOURNAL_FSYNC_INTERVAL
+            )
+        self._slots: Optional[Dict[int, Dict[str, Any]]] = None  # State the next save is diffed against
+        self._slots_version = None
+        
+        self.store = SQLiteStore(self.data_dir / "parking.db") if storage == 'sqlite' else None
+        self._bases = self._base_versions.setdefault(str(self.parking_file.resolve()), OrderedDict())
+    
+    def _locked(self) -> FileLock:
+        # A fresh lock per operation, the instance may be shared between Streamlit sessions
+        return FileLock(self.lock_file)
     
-    def load_parking_data(self) -> List[Dict[str, Any]]:
+    def _read_version(self) -> int:
+        try:
+            with open(self.version_file, 'r') as f:
+                return int(json.load(f))
+        except (FileNotFoundError, ValueError):
+            return 0
+    
+    def current_version(self) -> int:
+        """Version of the data on disk, bumped by every save"""
+        return self._read_version()
+    
+    def _remember(self, version: int, data: List[Slot]) -> None:
+        # Slots are immutable, a shallow copy keeps later edits to the list out
+        self._bases[version] = list(data)
+        self._bases.move_to_end(version)
+        while len(self._bases) > self.MAX_BASE_VERSIONS:
+            self._bases.popitem(last=False)
+    
+    def load_versioned(self) -> Tuple[List[Slot], int]:
+        """Parking data together with its version, to pass back as base_version when saving"""
+        with self._locked():
+            version = self._read_version()
+            data = slots_from_dicts(self._load_unlocked(version))
+            self._remember(version, data)
+        return data, version
+    
+    def load_parking_data(self) -> List[Slot]:
         """Load parking data from JSON file or initialize with sample data"""
+        return self.load_versioned()[0]
+    
+    def _load_unlocked(self, version: int) -> List[Dict[str, Any]]:
+        if self.store is not None:
+            return self.store.load_slots() or self._initialize_parking_data()
+        
+        if self.journal is not None:
+            # Only count and repair the log here, with the data lock held, never while another process appends
+            self.journal.refresh()
+            slots = self._rebuild_slots()
+            if slots is None:
+                return self._initialize_parking_data()
+            self._slots = slots
+            self._slots_version = version
+            return list(slots.values())
+        
         if self.parking_file.exists():
             with open(self.parking_file, 'r') as f:
                 return json.load(f)
         else:
             return self._initialize_parking_data()
     
-    def save_parking_data(self, data: List[Dict[str, Any]]) -> None:
-        """Save parking data to JSON file"""
-        with open(self.parking_file, 'w') as f:
-            json.dump(data, f, indent=2)
+    def save_parking_data(self, data: List[Slot], base_version: Optional[int] = None) -> int:
+        """Save parking data under the data lock and return its new version.
+        
+        ``base_version`` is the version ``data`` was loaded at. When others saved
+        since, the save is merged slot by slot: slots only this caller changed are
+        written, slots only others changed are kept, and a slot changed on both
+        sides raises SaveConflictError. ``data`` is updated in place with the
+        merged result. Without ``base_version`` the save overwrites.
+        """
+        with self._locked():
+            current_version = self._read_version()
+            if base_version is not None and base_version != current_version:
+                current = slots_from_dicts(self._load_unlocked(current_version))
+                data[:] = self._merge(data, base_version, current)
+            
+            records = slots_to_dicts(data)
+            if self.store is not None:
+                self.store.save_slots(records)
+            elif self.journal is not None:
+                if self._slots_version != current_version:
+                    # Another process wrote since this instance last looked
+                    self._slots = None
+                    self.journal.refresh()
+                self._append_changes(records)
+            else:
+                write_json_atomic(self.parking_file, records)
+            
+            version = current_version + 1
+            write_json_atomic(self.version_file, version, indent=None)
+            self._slots_version = version
+            self._remember(version, data)
+        return version
+    
+    def _merge(self, data: List[Slot], base_version: int, current: List[Slot]) -> List[Slot]:
+        base = self._bases.get(base_version)
+        if base is None:
+            raise SaveConflictError("Parking data changed since it was loaded, reload and try again")
+        
+        base_slots = {slot.slot: slot for slot in base}
+        current_slots = {slot.slot: slot for slot in current}
+        merged = dict(current_slots)
+        conflicts = []
+        for slot in data:
+            number = slot.slot
+            if slot == base_slots.get(number):
+                continue
+            if current_slots.get(number) in (base_slots.get(number), slot):
+                merged[number] = slot
+            else:
+                conflicts.append(number)
+        
+        if conflicts:
+            raise SaveConflictError(
+                f"Slot(s) {', '.join(map(str, conflicts))} were changed in another session, reload and try again",
+                conflicts
+            )
+        return [merged[number] for number in sorted(merged)]
+    
+    def _rebuild_slots(self) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Snapshot plus every logged change, or None when nothing has been saved yet"""
+        if not self.parking_file.exists():
+            return None
+        with open(self.parking_file, 'r') as f:
+            slots = {slot['slot']: slot for slot in json.load(f)}
+        for record in self.journal.replay():
+            slots[record['slot']] = record['data']
+        return dict(sorted(slots.items()))
+    
+    def _append_changes(self, data: List[Dict[str, Any]]) -> None:
+        """Log one record per slot that differs from the last known state"""
+        if self._slots is None:
+            self._slots = self._rebuild_slots()
+        if self._slots is None:
+            self._slots = {slot['slot']: copy.deepcopy(slot) for slot in data}
+            self.compact()
+            return
+        
+        records = []
+        for slot in data:
+            previous = self._slots.get(slot['slot'])
+            if slot != previous:
+                records.append({'op': self._change_type(previous, slot), 'slot': slot['slot'], 'data': slot})
+                self._slots[slot['slot']] = copy.deepcopy(slot)
+        self.journal.append(records)
+        
+        if len(self.journal) >= JOURNAL_COMPACT_EVERY:
+            self.compact()
+    
+    @staticmethod
+    def _change_type(previous: Optional[Dict[str, Any]], slot: Dict[str, Any]) -> str:
+        previous = previous or {}
+        if slot.get('vehicleType') and not previous.get('vehicleType'):
+            return 'park'
+        if previous.get('vehicleType') and not slot.get('vehicleType'):
+            return 'remove'
+        if slot.get('isReserved') and not previous.get('isReserved'):
+            return 'reserve'
+        if previous.get('isReserved') and not slot.get('isReserved'):
+            return 'unreserve'
+        return 'update'
+    
+    def compact(self) -> None:
+        """Write the current state as the new snapshot and empty the log, call with the data lock held"""
+        if self.journal is None or self._slots is None:
+            return
+        self.journal.sync()
+        write_json_atomic(self.parking_file, list(self._slots.values()))
+        # A crash before this reset only means the log is replayed onto a snapshot that already contains it
+        self.journal.reset()
+    
+    def record_stay(self, bill: Dict[str, Any]) -> None:
+        """Keep a completed bill in the stays history, only the sqlite storage has one"""
+        if self.store is not None:
+            self.store.record_stay(bill)
+    
+    def load_stays(self, vehicle_number: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Completed stays, newest first, empty unless the sqlite storage is used"""
+        if self.store is None:
+            return []
+        return self.store.load_stays(vehicle_number)
     
     def load_holidays(self) -> List[Dict[str, Any]]:
         """Load holiday data from JSON file"""
+        if self.store is not None:
+            return self.store.load_holidays() or self._initialize_holidays()
+        
         if self.holidays_file.exists():
             with open(self.holidays_file, 'r') as f:
                 return json.load(f)
@@ -83,7 +291,13 @@ class DataManager:
             }
         })
         
-        self.save_parking_data(parking_data)
+        # Called while loading, with the data lock already held
+        if self.store is not None:
+            self.store.save_slots(parking_data)
+        elif self.journal is not None:
+            self._append_changes(parking_data)
+        else:
+            write_json_atomic(self.parking_file, parking_data)
         return parking_data
     
     def _initialize_holidays(self) -> List[Dict[str, Any]]:
@@ -123,7 +337,9 @@ class DataManager:
             {"date": "31-12-2025", "name": "New Year's Eve", "rushFrom": "00:00", "rushTo": "23:59"}
         ]
         
-        with open(self.holidays_file, 'w') as f:
-            json.dump(holidays, f, indent=2)
+        if self.store is not None:
+            self.store.save_holidays(holidays)
+        else:
+            write_json_atomic(self.holidays_file, holidays)
         
         return holidays
@@ -1,88 +1,230 @@
-import requests
-from typing import Dict, Any, Optional
+import asyncio
+import json
+import os
+import threading
 import time
-import streamlit as st
+from collections import deque
+from typing import Dict, Any, Iterator, List, Optional
 
 import requests
-from typing import Dict, Any, Optional
-import streamlit as st
-import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+CLOUD_DEPLOYMENT_MESSAGE = "AI detection is not available in cloud deployment. Please use manual mode."
+
+
+def is_cloud_deployment() -> bool:
+    """Check if running in Streamlit Cloud or other remote environment"""
+    # Streamlit Cloud sets these environment variables
+    return (
+        os.getenv('STREAMLIT_SHARING_MODE') is not None or
+        os.getenv('STREAMLIT_SERVER_HEADLESS') == 'true' or
+        'streamlit.app' in os.getenv('HOSTNAME', '') or
+        'streamlit.app' in os.getenv('SERVER_NAME', '')
+    )
+
+
+class LatencyTracker:
+    """Round-trip times of recent requests, per endpoint.
+
+    Safe to share between threads, the Streamlit pages share one client across sessions.
+    """
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {endpoint: list(samples) for endpoint, samples in self._samples.items()}
+        stats = {}
+        for endpoint, samples in snapshot.items():
+            ordered = sorted(samples)
+            stats[endpoint] = {
+                'count': len(ordered),
+                'last_ms': samples[-1] * 1000,
+                'avg_ms': sum(ordered) / len(ordered) * 1000,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+            }
+        return stats
+
 
 class DetectionAPI:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    """Client for the detection server.
+
+    Requests go through one pooled keep-alive session, so repeated polls reuse
+    the TCP connection. Idempotent GETs are retried with backoff on connection
+    errors and 502/503/504 responses; POSTs are not, since a retried
+    start_detection could start a second session. Long-polls go through a
+    second session that never retries a read timeout, which would otherwise
+    hold the page for several full waits on a stuck server.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8000", retries: int = 3,
+                 backoff_factor: float = 0.3, pool_size: int = 4):
         self.base_url = base_url
-        self.is_cloud_deployment = self._check_if_cloud_deployment()
-    
-    def _check_if_cloud_deployment(self) -> bool:
-        """Check if running in Streamlit Cloud or other remote environment"""
-        # Streamlit Cloud sets these environment variables
-        return (
-            os.getenv('STREAMLIT_SHARING_MODE') is not None or
-            os.getenv('STREAMLIT_SERVER_HEADLESS') == 'true' or
-            'streamlit.app' in os.getenv('HOSTNAME', '') or
-            'streamlit.app' in os.getenv('SERVER_NAME', '')
+        self.is_cloud_deployment = is_cloud_deployment()
+        self.latency = LatencyTracker()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET'}),
+            raise_on_status=False
         )
-    
-    def health_check(self) -> Dict[str, Any]:
-        """Check if the detection server is running"""
-        if self.is_cloud_deployment:
-            return {
-                "status": "cloud_deployment",
-                "message": "AI detection is not available in cloud deployment. Please use manual mode."
-            }
-        
-        try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "message": f"Server not available: {str(e)}"}
-    
-    def start_detection(self) -> Dict[str, Any]:
-        """Start the AI detection process"""
+        self.session = self._pooled_session(retry, pool_size)
+        self.long_poll_session = self._pooled_session(retry.new(read=0), pool_size)
+
+    @staticmethod
+    def _pooled_session(retry: Retry, pool_size: int) -> requests.Session:
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _session_url(self, endpoint: str, session_id: Optional[str]) -> str:
+        url = f"{self.base_url}/{endpoint}"
+        return f"{url}/{session_id}" if session_id else url
+
+    def _request(self, method: str, endpoint: str, session_id: Optional[str] = None, timeout: float = 5,
+                 error_prefix: str = "Connection error", metric: Optional[str] = None,
+                 http: Optional[requests.Session] = None, **kwargs) -> Dict[str, Any]:
         if self.is_cloud_deployment:
-            return {
-                "status": "cloud_deployment",
-                "message": "AI detection is not available in cloud deployment"
-            }
-        
-        try:
-            response = requests.post(f"{self.base_url}/start_detection", timeout=10)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "message": f"Connection error: {str(e)}"}
-    
-    # ... other methods with similar cloud deployment checks
-
-    
-    def start_detection(self) -> Dict[str, Any]:
-        """Start the AI detection process"""
-        try:
-            response = requests.post(f"{self.base_url}/start_detection", timeout=10)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "message": f"Connection error: {str(e)}"}
-    
-    def get_results(self) -> Dict[str, Any]:
-        """Get current detection results"""
-        try:
-            response = requests.get(f"{self.base_url}/get_results", timeout=5)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "message": f"Connection error: {str(e)}"}
-    
-    def reset_detection(self) -> Dict[str, Any]:
-        """Reset the detection system"""
+            return {"status": "cloud_deployment", "message": CLOUD_DEPLOYMENT_MESSAGE}
+
+        http = http or self.session
+        start = time.perf_counter()
         try:
-            response = requests.post(f"{self.base_url}/reset", timeout=5)
+            response = http.request(method, self._session_url(endpoint, session_id), timeout=timeout, **kwargs)
             return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "message": f"Connection error: {str(e)}"}
-    
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return {"status": "error", "message": f"{error_prefix}: {str(e)}"}
+        finally:
+            self.latency.record(metric or endpoint, time.perf_counter() - start)
+
     def health_check(self) -> Dict[str, Any]:
         """Check if the detection server is running"""
+        return self._request("GET", "health", error_prefix="Server not available")
+
+    def start_detection(self, camera: Optional[str] = None) -> Dict[str, Any]:
+        """Start the AI detection process, on the server's default camera unless one is given"""
+        payload = {"camera": camera} if camera is not None else None
+        return self._request("POST", "start_detection", timeout=10, json=payload)
+
+    def get_results(self, session_id: Optional[str] = None, since: Optional[int] = None,
+                    wait: float = 20) -> Dict[str, Any]:
+        """Get current detection results for a session, or the latest session.
+
+        With ``since``, long-poll: the server answers once the state version changes or after ``wait`` seconds.
+        """
+        if since is None:
+            return self._request("GET", "get_results", session_id)
+        # Long-polls are timed separately, their duration is mostly server-side waiting
+        return self._request("GET", "get_results", session_id, timeout=wait + 5, metric="get_results_wait",
+                             http=self.long_poll_session, params={"since": since, "wait": wait})
+
+    def reset_detection(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Reset a detection session, or the latest session"""
+        return self._request("POST", "reset", session_id)
+
+    def stream_events(self, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield session states pushed by the server's event stream, ends quietly if the stream is unavailable"""
+        if self.is_cloud_deployment:
+            return
+        try:
+            with self.session.get(self._session_url("events", session_id), stream=True, timeout=(5, 30)) as response:
+                if response.status_code != 200:
+                    return
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data:"):
+                        yield json.loads(line[5:])
+        except (requests.exceptions.RequestException, ValueError):
+            return
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Round-trip latency per endpoint, in milliseconds"""
+        return self.latency.stats()
+
+    def close(self) -> None:
+        self.session.close()
+        self.long_poll_session.close()
+
+
+class AsyncDetectionAPI:
+    """asyncio client for polling several detection servers (one per gate) concurrently.
+
+    Requires httpx. Connection attempts are retried by the transport; like the
+    sync client, requests share one pooled keep-alive connection per server.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8000", retries: int = 3, pool_size: int = 4):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("AsyncDetectionAPI requires httpx: pip install httpx")
+        self.base_url = base_url
+        self.is_cloud_deployment = is_cloud_deployment()
+        self.latency = LatencyTracker()
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            transport=httpx.AsyncHTTPTransport(retries=retries),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def _request(self, method: str, endpoint: str, session_id: Optional[str] = None, timeout: float = 5,
+                       error_prefix: str = "Connection error", metric: Optional[str] = None,
+                       **kwargs) -> Dict[str, Any]:
+        if self.is_cloud_deployment:
+            return {"status": "cloud_deployment", "message": CLOUD_DEPLOYMENT_MESSAGE}
+
+        path = f"/{endpoint}/{session_id}" if session_id else f"/{endpoint}"
+        start = time.perf_counter()
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = await self.client.request(method, path, timeout=timeout, **kwargs)
             return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "message": f"Server not available: {str(e)}"}
+        except (httpx.HTTPError, ValueError) as e:
+            return {"status": "error", "message": f"{error_prefix}: {str(e)}"}
+        finally:
+            self.latency.record(metric or endpoint, time.perf_counter() - start)
+
+    async def health_check(self) -> Dict[str, Any]:
+        return await self._request("GET", "health", error_prefix="Server not available")
+
+    async def start_detection(self, camera: Optional[str] = None) -> Dict[str, Any]:
+        payload = {"camera": camera} if camera is not None else None
+        return await self._request("POST", "start_detection", timeout=10, json=payload)
+
+    async def get_results(self, session_id: Optional[str] = None, since: Optional[int] = None,
+                          wait: float = 20) -> Dict[str, Any]:
+        if since is None:
+            return await self._request("GET", "get_results", session_id)
+        return await self._request("GET", "get_results", session_id, timeout=wait + 5, metric="get_results_wait",
+                                   params={"since": since, "wait": wait})
+
+    async def reset_detection(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        return await self._request("POST", "reset", session_id)
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.latency.stats()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
 
+async def poll_gates(clients: List[AsyncDetectionAPI],
+                     session_ids: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+    """Fetch the latest results from every gate's server at once"""
+    session_ids = session_ids or [None] * len(clients)
+    return await asyncio.gather(*(client.get_results(session_id)
+                                  for client, session_id in zip(clients, session_ids)))
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive advisory lock on a lock file.
+
+    Every process and thread that opens the same lock file is serialized, so
+    several Streamlit workers can share one data directory. Only cooperating
+    code that takes the lock is kept out.
+    """
+
+    def __init__(self, path, timeout: float = 10.0, poll_interval: float = 0.05):
+        self.path = str(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._file = None
+
+    def acquire(self) -> None:
+        self._file = open(self.path, 'a+')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._lock()
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"Could not lock {self.path} within {self.timeout}s")
+                time.sleep(self.poll_interval)
+
+    def _lock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def write_json_atomic(path, data, indent=2) -> None:
+    """Write JSON to a temp file next to ``path`` and rename it into place.
+
+    Readers see either the old or the new file, never a partial one, and a
+    crash mid-write leaves the old file untouched.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
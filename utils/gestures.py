@@ -0,0 +1,78 @@
+from collections import Counter, deque
+from typing import Hashable, Sequence, Tuple
+
+import numpy as np
+
+# MediaPipe hand landmark indices
+THUMB_TIP, THUMB_IP = 4, 3
+INDEX_TIP = 8
+FINGER_TIPS = np.array([8, 12, 16, 20])
+FINGER_PIPS = np.array([6, 10, 14, 18])
+OK_EXTENDED_TIPS = np.array([12, 16, 20])  # Middle, ring and pinky stay up in an OK sign
+OK_EXTENDED_PIPS = np.array([10, 14, 18])
+
+OK_CIRCLE_DISTANCE = 0.05
+OK_EXTENSION_MARGIN = 0.02
+
+
+def landmarks_to_array(multi_hand_landmarks) -> np.ndarray:
+    """Normalized (x, y) of every landmark as one (hands, 21, 2) array"""
+    hands = list(multi_hand_landmarks or [])
+    if not hands:
+        return np.empty((0, 21, 2), dtype=np.float32)
+    coords = (c for hand in hands for lm in hand.landmark for c in (lm.x, lm.y))
+    return np.fromiter(coords, dtype=np.float32, count=len(hands) * 42).reshape(len(hands), 21, 2)
+
+
+def analyze_hands(landmarks: np.ndarray, hand_labels: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Raised finger count and OK sign for every hand of a frame at once.
+
+    ``landmarks`` comes from ``landmarks_to_array`` and ``hand_labels`` holds
+    MediaPipe's "Left"/"Right" handedness per hand. Returns an int array of
+    finger counts and a bool array of OK signs, one entry per hand.
+    """
+    if len(landmarks) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=bool)
+
+    x = landmarks[:, :, 0]
+    y = landmarks[:, :, 1]
+
+    # The thumb folds sideways, so compare x, mirrored between left and right hands
+    is_right = np.array([label == "Right" for label in hand_labels])
+    thumb_up = np.where(is_right, x[:, THUMB_TIP] < x[:, THUMB_IP], x[:, THUMB_TIP] > x[:, THUMB_IP])
+    fingers_up = (y[:, FINGER_TIPS] < y[:, FINGER_PIPS]).sum(axis=1)
+    finger_counts = thumb_up.astype(int) + fingers_up
+
+    circle = np.linalg.norm(landmarks[:, THUMB_TIP] - landmarks[:, INDEX_TIP], axis=1) < OK_CIRCLE_DISTANCE
+    extended = (y[:, OK_EXTENDED_TIPS] < y[:, OK_EXTENDED_PIPS] - OK_EXTENSION_MARGIN).all(axis=1)
+    return finger_counts, circle & extended
+
+
+class VoteSmoother:
+    """Majority vote over the last ``window`` values, to steady a noisy per-frame count.
+
+    Until ``min_votes`` values have been seen the latest value is returned as is.
+    Ties go to the latest value.
+    """
+
+    def __init__(self, window: int = 5, min_votes: int = 3):
+        self.min_votes = min_votes
+        self._values = deque(maxlen=window)
+        self._counts = Counter()
+
+    def update(self, value: Hashable) -> Hashable:
+        if len(self._values) == self._values.maxlen:
+            evicted = self._values[0]
+            self._counts[evicted] -= 1
+            if not self._counts[evicted]:
+                del self._counts[evicted]
+        self._values.append(value)
+        self._counts[value] += 1
+
+        if len(self._values) < self.min_votes:
+            return value
+        return max(self._counts, key=lambda v: (self._counts[v], v == value))
+
+    def reset(self) -> None:
+        self._values.clear()
+        self._counts.clear()
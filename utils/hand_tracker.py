@@ -0,0 +1,102 @@
+import statistics
+import threading
+import time
+from collections import deque
+from typing import List
+
+import cv2
+import numpy as np
+
+
+class HandTracker:
+    """A MediaPipe Hands graph that runs on downscaled, mirrored frames.
+
+    Frames are shrunk to ``process_width`` before the flip and colour
+    conversion, whatever the capture resolution. Landmarks are normalized, so
+    they still map onto the full-size mirrored frame. When the median
+    per-frame latency over the last ``latency_window`` frames exceeds
+    ``latency_budget`` seconds, the tracker falls back to ``model_complexity=0``.
+    """
+
+    def __init__(self, process_width: int = 480, model_complexity: int = 1, latency_budget: float = 0.0,
+                 latency_window: int = 30, max_num_hands: int = 2, min_detection_confidence: float = 0.8,
+                 min_tracking_confidence: float = 0.7):
+        import mediapipe as mp
+
+        self._mp_hands = mp.solutions.hands
+        self.process_width = process_width
+        self.latency_budget = latency_budget
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self._latencies = deque(maxlen=latency_window)
+        self.model_complexity = model_complexity
+        self._hands = self._create_hands(model_complexity)
+
+    def _create_hands(self, model_complexity: int):
+        return self._mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=self.max_num_hands,
+            min_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence,
+            model_complexity=model_complexity
+        )
+
+    def process(self, frame: np.ndarray):
+        """Run hand tracking on a BGR camera frame, landmarks refer to the mirrored image"""
+        h, w = frame.shape[:2]
+        if self.process_width and w > self.process_width:
+            scale = self.process_width / w
+            frame = cv2.resize(frame, (self.process_width, int(h * scale)), interpolation=cv2.INTER_AREA)
+        frame_rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+
+        start = time.perf_counter()
+        results = self._hands.process(frame_rgb)
+        self._latencies.append(time.perf_counter() - start)
+        self._check_budget()
+        return results
+
+    def _check_budget(self) -> None:
+        if (self.latency_budget <= 0 or self.model_complexity == 0
+                or len(self._latencies) < self._latencies.maxlen):
+            return
+        median = statistics.median(self._latencies)
+        if median > self.latency_budget:
+            print(f"Hand tracking takes {median * 1000:.0f}ms per frame, over the "
+                  f"{self.latency_budget * 1000:.0f}ms budget. Switching to model_complexity=0")
+            self._hands.close()
+            self.model_complexity = 0
+            self._hands = self._create_hands(0)
+            self._latencies.clear()
+
+    def close(self) -> None:
+        self._hands.close()
+
+
+class HandTrackerPool:
+    """Keeps HandTracker instances alive between detection sessions.
+
+    A tracker serves one session at a time; concurrent sessions each take
+    their own, and trackers are created only when none is idle.
+    """
+
+    def __init__(self, **tracker_kwargs):
+        self._tracker_kwargs = tracker_kwargs
+        self._idle: List[HandTracker] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> HandTracker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return HandTracker(**self._tracker_kwargs)
+
+    def release(self, tracker: HandTracker) -> None:
+        with self._lock:
+            self._idle.append(tracker)
+
+    def close(self) -> None:
+        with self._lock:
+            for tracker in self._idle:
+                tracker.close()
+            self._idle.clear()
@@ -0,0 +1,61 @@
+import time
+from typing import Optional
+
+
+class InferenceScheduler:
+    """Decides which frames of a detection loop get a full detector pass.
+
+    By default the detector runs on every ``stride``-th frame, or at most once
+    every ``interval`` seconds when an interval is set. Between inferences the
+    loop carries the last detections forward unchanged; boxes are not tracked
+    or moved with the vehicle, so they lag by up to one stride. When the best confidence is borderline
+    (above the detection threshold but below ``borderline_confidence``) the
+    detector runs on every frame until the result is clear.
+    """
+
+    def __init__(self, stride: int = 3, interval: float = 0.0, detection_threshold: float = 0.25,
+                 borderline_confidence: float = 0.5):
+        self.stride = max(1, stride)
+        self.interval = interval
+        self.detection_threshold = detection_threshold
+        self.borderline_confidence = borderline_confidence
+        self._frames_since_inference = None
+        self._last_inference_time = None
+        self._borderline = False
+        self.frames_seen = 0
+        self.inferences_run = 0
+
+    def should_infer(self) -> bool:
+        """Call once per frame, returns True when this frame should go through the detector"""
+        self.frames_seen += 1
+        if self._frames_since_inference is not None:
+            self._frames_since_inference += 1
+
+        if self._borderline or self._frames_since_inference is None:
+            due = True
+        elif self.interval > 0:
+            due = time.monotonic() - self._last_inference_time >= self.interval
+        else:
+            due = self._frames_since_inference >= self.stride
+
+        if due:
+            self._frames_since_inference = 0
+            self._last_inference_time = time.monotonic()
+            self.inferences_run += 1
+        return due
+
+    def update(self, best_confidence: Optional[float]) -> None:
+        """Report the best confidence of the latest inference"""
+        best_confidence = best_confidence or 0
+        self._borderline = self.detection_threshold < best_confidence < self.borderline_confidence
+
+    @property
+    def is_fresh(self) -> bool:
+        """True when the current frame's detections come from an inference on this frame"""
+        return self._frames_since_inference == 0
+
+    def stats(self) -> dict:
+        return {
+            'frames_seen': self.frames_seen,
+            'inferences_run': self.inferences_run
+        }
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class ParkingJournal:
+    """Append-only write-ahead log of slot changes.
+
+    Each record is one compact JSON line holding the full new state of one
+    slot, so replaying a record twice is harmless. Writes are flushed to the
+    OS immediately but fsynced in batches: after ``fsync_every`` records or
+    ``fsync_interval`` seconds, whichever comes first. A background timer
+    covers the interval when no further write arrives. A crash can lose at
+    most that batch, never corrupt earlier records; a torn last line is
+    skipped on replay.
+
+    Constructing a journal does not touch the file. The record count is read,
+    and a torn tail cut off, by refresh(), which like append() must only run
+    with the data lock held: without it the "torn" tail may be another
+    process's record still being written.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 8, fsync_interval: float = 1.0):
+        self.path = Path(path)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.seq: Optional[int] = None  # Record count, read by refresh()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._timer = None  # Pending interval sync
+        self._lock = threading.RLock()  # The timer syncs from its own thread
+
+    def _repair(self) -> int:
+        """Cut a torn tail left by a crash so new records are not appended after it, returns the record count"""
+        if not self.path.exists():
+            return 0
+        count = 0
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                count += 1
+                valid_end += len(line)
+        if valid_end < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+        return count
+
+    def refresh(self) -> None:
+        """Re-read the record count after another process appended to or compacted the log, call with the data lock held"""
+        self.seq = self._repair()
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        with self._lock:
+            if self.seq is None:
+                self.refresh()
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+
+            lines = []
+            for record in records:
+                self.seq += 1
+                lines.append(json.dumps({'seq': self.seq, 'ts': round(time.time(), 3), **record},
+                                        separators=(',', ':')))
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+
+            self._unsynced += len(records)
+            elapsed = time.monotonic() - self._last_sync
+            if self._unsynced >= self.fsync_every or elapsed >= self.fsync_interval:
+                self.sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.fsync_interval - elapsed, self._timed_sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+            self.sync()
+
+    def sync(self) -> None:
+        """Force buffered records to disk"""
+        with self._lock:
+            if self._timer is not None and self._timer is not threading.current_thread():
+                self._timer.cancel()
+                self._timer = None
+            if self._file is not None and self._unsynced:
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield the records in write order, stopping at a torn or corrupt line"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    break
+
+    def __len__(self) -> int:
+        return self.seq or 0
+
+    def reset(self) -> None:
+        """Empty the log once its records are part of a snapshot"""
+        with self._lock:
+            self.close()
+            with open(self.path, 'w', encoding='utf-8') as f:
+                os.fsync(f.fileno())
+            self.seq = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,118 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from ultralytics import YOLO
+
+logger = logging.getLogger(__name__)
+
+# Inference backends: eager PyTorch, or a model exported once for an optimized CPU runtime
+MODEL_BACKENDS = ('pytorch', 'onnx', 'openvino')
+
+
+def exported_model_path(weights_path: str, backend: str) -> Path:
+    """Where ultralytics writes the exported model for a weights file"""
+    stem = Path(weights_path).with_suffix('')
+    if backend == 'onnx':
+        return stem.with_suffix('.onnx')
+    if backend == 'openvino':
+        return Path(f"{stem}_openvino_model")
+    return Path(weights_path)
+
+
+def _is_up_to_date(exported: Path, weights_path: str) -> bool:
+    if not exported.exists():
+        return False
+    # Weights that ultralytics downloads on demand may not exist locally yet
+    if not os.path.exists(weights_path):
+        return True
+    return exported.stat().st_mtime >= os.path.getmtime(weights_path)
+
+
+def ensure_exported(weights_path: str, backend: str, imgsz: int = 640) -> str:
+    """Return a model path for the backend, exporting the PyTorch weights once and reusing the artifact after that"""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend}")
+    if backend == 'pytorch':
+        return weights_path
+
+    exported = exported_model_path(weights_path, backend)
+    if _is_up_to_date(exported, weights_path):
+        return str(exported)
+
+    start = time.perf_counter()
+    print(f"Exporting {weights_path} to {backend}...")
+    # Dynamic input shapes so the plate model can also run on smaller ROI inputs
+    output = YOLO(weights_path).export(format=backend, imgsz=imgsz, dynamic=True)
+    print(f"Exported {weights_path} to {output} in {time.perf_counter() - start:.1f}s")
+    return str(output)
+
+
+def _runtime_owner(model: YOLO, attribute: str):
+    """The object holding the runtime in ``attribute`` once the model has predicted, None when it is not found.
+
+    These are private ultralytics AutoBackend attributes: older versions keep the
+    runtime on the AutoBackend itself, newer ones on a per-format backend object.
+    """
+    auto_backend = getattr(getattr(model, 'predictor', None), 'model', None)
+    for owner in (getattr(auto_backend, 'backend', None), auto_backend):
+        if owner is not None and hasattr(owner, attribute):
+            return owner
+    return None
+
+
+def limit_threads(model: YOLO, backend: str, model_path: str, threads: int) -> None:
+    """Recreate the exported model's runtime with ``threads`` CPU threads.
+
+    ultralytics creates ONNX Runtime and OpenVINO sessions with their defaults,
+    and neither runtime reads OMP_NUM_THREADS, so the runtime is rebuilt from
+    the same file with an explicit thread count. That relies on private
+    ultralytics attributes, so when they are not where this expects them a
+    warning is logged and the runtime keeps its default thread count.
+    """
+    if threads <= 0 or backend == 'pytorch':
+        return
+
+    # The runtime only exists after the first prediction
+    model(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+    if backend == 'onnx':
+        import onnxruntime
+        owner = _runtime_owner(model, 'session')
+        if owner is None or not isinstance(owner.session, onnxruntime.InferenceSession):
+            logger.warning(f"No ONNX Runtime session found on the ultralytics backend, "
+                           f"INFERENCE_THREADS={threads} is not applied to {model_path}")
+            return
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        owner.session = onnxruntime.InferenceSession(model_path, options, providers=owner.session.get_providers())
+    elif backend == 'openvino':
+        import openvino as ov
+        owner = _runtime_owner(model, 'ov_compiled_model')
+        if owner is None or not isinstance(owner.ov_compiled_model, ov.CompiledModel):
+            logger.warning(f"No OpenVINO compiled model found on the ultralytics backend, "
+                           f"INFERENCE_THREADS={threads} is not applied to {model_path}")
+            return
+        core = ov.Core()
+        xml_path = next(Path(model_path).glob('*.xml'))
+        config = {'PERFORMANCE_HINT': 'LATENCY', 'INFERENCE_NUM_THREADS': threads, 'NUM_STREAMS': 1}
+        owner.ov_compiled_model = core.compile_model(core.read_model(str(xml_path)), device_name='CPU', config=config)
+
+
+def load_model(weights_path: str, backend: str = 'pytorch', imgsz: int = 640, threads: int = 0) -> YOLO:
+    """Load a YOLO model for the given backend, exporting it first if needed.
+
+    ``threads`` caps the CPU threads of the ONNX Runtime and OpenVINO backends,
+    0 leaves the runtime default. PyTorch threads are set with torch.set_num_threads.
+    """
+    model_path = ensure_exported(weights_path, backend, imgsz=imgsz)
+    task: Optional[str] = None if backend == 'pytorch' else 'detect'
+    model = YOLO(model_path, task=task)
+    try:
+        limit_threads(model, backend, model_path, threads)
+    except Exception as e:
+        logger.warning(f"Could not set {threads} inference threads for {backend}, using the runtime default: {e}")
+    return model
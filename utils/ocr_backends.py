@@ -0,0 +1,163 @@
+import base64
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import cv2
+import numpy as np
+import requests
+
+# Try importing pytesseract for the local OCR engine
+try:
+    import pytesseract
+    pytesseract.get_tesseract_version()  # Verify the tesseract binary is installed
+    TESSERACT_AVAILABLE = True
+except Exception:
+    TESSERACT_AVAILABLE = False
+
+
+class OCRBackend(ABC):
+    """Base class for OCR engines.
+
+    Every backend returns a response shaped like the OCR.space API
+    (``ParsedResults`` / ``IsErroredOnProcessing``, or ``error`` on failure)
+    so the plate parsing code does not depend on the engine in use.
+    """
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, image: np.ndarray, timeout: float = 30) -> Dict[str, Any]:
+        pass
+
+    @staticmethod
+    def _parsed_response(text: str) -> Dict[str, Any]:
+        return {
+            "ParsedResults": [{"ParsedText": text}],
+            "IsErroredOnProcessing": False
+        }
+
+
+class OCRSpaceBackend(OCRBackend):
+    """Remote OCR through the OCR.space HTTP API"""
+    name = "ocrspace"
+
+    def __init__(self, api_key: str, api_url: str, language: str = 'eng'):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.language = language
+
+    def recognize(self, image: np.ndarray, timeout: float = 30) -> Dict[str, Any]:
+        """OCR.space API request with error handling."""
+        try:
+            _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            img_base64 = base64.b64encode(buffer).decode()
+
+            payload = {
+                'apikey': self.api_key,
+                'language': self.language,
+                'isOverlayRequired': False,
+                'base64Image': f'data:image/jpeg;base64,{img_base64}',
+                'OCREngine': '2',
+                'scale': 'true',
+                'isTable': 'false'
+            }
+
+            r = requests.post(self.api_url, data=payload, timeout=timeout)
+            if r.status_code == 200:
+                return r.json()
+            else:
+                return {"error": f"API request failed with status code {r.status_code}: {r.text}"}
+
+        except requests.exceptions.Timeout:
+            return {"error": "API request timed out"}
+        except requests.exceptions.RequestException as e:
+            return {"error": f"API request failed: {str(e)}"}
+        except Exception as e:
+            return {"error": f"Unexpected error: {str(e)}"}
+
+
+class TesseractBackend(OCRBackend):
+    """Local on-CPU OCR with Tesseract, no network round trip"""
+    name = "tesseract"
+
+    # Single text line, restricted to the characters found on Indian plates
+    DEFAULT_CONFIG = '--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+    def __init__(self, config: str = DEFAULT_CONFIG):
+        self.config = config
+
+    def recognize(self, image: np.ndarray, timeout: float = 30) -> Dict[str, Any]:
+        if not TESSERACT_AVAILABLE:
+            return {"error": "Tesseract is not installed"}
+
+        try:
+            text = pytesseract.image_to_string(image, config=self.config, timeout=timeout)
+            return self._parsed_response(text)
+        except RuntimeError:
+            return {"error": "Tesseract timed out"}
+        except Exception as e:
+            return {"error": f"Tesseract failed: {str(e)}"}
+
+
+def image_key(image: np.ndarray) -> str:
+    """Deterministic key for an image, used to look up recorded responses"""
+    digest = hashlib.sha1()
+    digest.update(str(image.shape).encode())
+    digest.update(np.ascontiguousarray(image).tobytes())
+    return digest.hexdigest()
+
+
+class ReplayBackend(OCRBackend):
+    """Serve recorded responses from ``<directory>/<image_key>.json`` for offline runs and benchmarks"""
+    name = "replay"
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def recognize(self, image: np.ndarray, timeout: float = 30) -> Dict[str, Any]:
+        response_file = self.directory / f"{image_key(image)}.json"
+        if not response_file.exists():
+            return {"error": f"No recorded response for image {response_file.stem}"}
+
+        with open(response_file, 'r') as f:
+            return json.load(f)
+
+
+class RecordingBackend(OCRBackend):
+    """Wrap another backend and record its responses for later replay"""
+    name = "recording"
+
+    def __init__(self, backend: OCRBackend, directory: str):
+        self.backend = backend
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def recognize(self, image: np.ndarray, timeout: float = 30) -> Dict[str, Any]:
+        result = self.backend.recognize(image, timeout=timeout)
+        if "error" not in result:
+            with open(self.directory / f"{image_key(image)}.json", 'w') as f:
+                json.dump(result, f)
+        return result
+
+
+def create_ocr_backend(name: str, api_key: Optional[str] = None, api_url: Optional[str] = None,
+                       replay_dir: Optional[str] = None, record_dir: Optional[str] = None) -> OCRBackend:
+    """Build an OCR backend by name: ocrspace, tesseract or replay"""
+    name = (name or OCRSpaceBackend.name).lower()
+
+    if name == OCRSpaceBackend.name:
+        backend = OCRSpaceBackend(api_key, api_url)
+    elif name == TesseractBackend.name:
+        backend = TesseractBackend()
+    elif name == ReplayBackend.name:
+        backend = ReplayBackend(replay_dir or os.path.join("data", "ocr_recordings"))
+    else:
+        raise ValueError(f"Unknown OCR backend: {name}")
+
+    if record_dir and not isinstance(backend, ReplayBackend):
+        backend = RecordingBackend(backend, record_dir)
+
+    return backend
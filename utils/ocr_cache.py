@@ -0,0 +1,191 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Any
+
+import cv2
+import numpy as np
+
+THUMBNAIL_SIZE = (96, 24)  # width, height of the crop kept to verify a hash match
+THUMBNAIL_STRIPS = 12  # vertical strips compared separately, roughly one per plate character
+
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit difference hash (dHash) of an image.
+
+    Near-identical crops of the same plate (small shifts, JPEG noise, lighting)
+    produce hashes that differ in only a few bits.
+    """
+    if len(image.shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def thumbnail(image: np.ndarray) -> np.ndarray:
+    """Small grayscale copy of a crop, normalised for brightness and contrast"""
+    if len(image.shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    return (small - small.mean()) / (small.std() + 1e-6)
+
+
+def crop_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Largest mean difference between two thumbnails over any vertical strip.
+
+    Comparing strip by strip keeps a single differing character from being
+    averaged away over the whole plate.
+    """
+    width, height = THUMBNAIL_SIZE
+    diff = np.abs(a - b).reshape(height, THUMBNAIL_STRIPS, width // THUMBNAIL_STRIPS)
+    return float(diff.mean(axis=(0, 2)).max())
+
+
+class OCRCache:
+    """LRU cache of OCR candidate lists keyed by a perceptual hash of the plate crop.
+
+    A stored hash within ``max_distance`` bits is only a candidate: the hit is
+    confirmed by comparing a thumbnail of both crops, since plates that differ
+    in one character can share a hash. Entries expire after ``ttl`` seconds and
+    the least recently used entry is evicted once ``max_entries`` is reached.
+    When ``cache_dir`` is set, entries are also written to disk and reloaded on
+    start-up.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600, cache_dir: Optional[str] = None,
+                 max_distance: int = 6, max_difference: float = 0.5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.max_difference = max_difference
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()  # hash -> (created, thumbnail, candidates)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_from_disk()
+
+    def _is_expired(self, created: float, now: float) -> bool:
+        return now - created > self.ttl
+
+    def _find(self, key: int, thumb: np.ndarray, now: float) -> Optional[int]:
+        """Return the stored key whose hash is close to ``key`` and whose crop matches ``thumb``"""
+        best_key, best_difference = None, self.max_difference
+        for stored_key, (created, stored_thumb, _) in self._entries.items():
+            if self._is_expired(created, now) or hamming_distance(key, stored_key) > self.max_distance:
+                continue
+            difference = crop_difference(thumb, stored_thumb)
+            if difference <= best_difference:
+                best_key, best_difference = stored_key, difference
+        return best_key
+
+    def get(self, image: np.ndarray) -> Optional[List[Tuple[Any, ...]]]:
+        """Return cached candidates for a near-identical crop, or None on a miss"""
+        if image is None:
+            return None
+
+        key = perceptual_hash(image)
+        thumb = thumbnail(image)
+        now = time.time()
+        with self._lock:
+            stored_key = self._find(key, thumb, now)
+            if stored_key is not None:
+                self._entries.move_to_end(stored_key)
+                self.hits += 1
+                return list(self._entries[stored_key][2])
+            self.misses += 1
+            return None
+
+    def put(self, image: np.ndarray, candidates: List[Tuple[Any, ...]]) -> None:
+        """Store the candidate list for a crop"""
+        if image is None:
+            return
+
+        key = perceptual_hash(image)
+        thumb = thumbnail(image)
+        created = time.time()
+        candidates = [tuple(candidate) for candidate in candidates]
+        with self._lock:
+            self._entries[key] = (created, thumb, candidates)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+        if self.cache_dir:
+            try:
+                with open(self._entry_path(key), 'w') as f:
+                    json.dump({'created': created, 'thumbnail': thumb.tolist(), 'candidates': candidates}, f)
+            except OSError as e:
+                print(f"Error writing OCR cache entry: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl
+        }
+
+    def _entry_path(self, key: int) -> Path:
+        return self.cache_dir / f"{key:016x}.json"
+
+    def _remove(self, key: int) -> None:
+        self._entries.pop(key, None)
+        if self.cache_dir:
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+
+    def _load_from_disk(self) -> None:
+        now = time.time()
+        loaded = []
+        for entry_file in self.cache_dir.glob('*.json'):
+            try:
+                with open(entry_file, 'r') as f:
+                    entry = json.load(f)
+                key = int(entry_file.stem, 16)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(entry, dict):
+                continue
+            if len(entry_file.stem) != 16 or 'thumbnail' not in entry:
+                # Written by an earlier version without a crop to verify hits against
+                entry_file.unlink()
+                continue
+            try:
+                created = float(entry['created'])
+                thumb = np.array(entry['thumbnail'], dtype=np.float32).reshape(THUMBNAIL_SIZE[::-1])
+                candidates = [tuple(c) for c in entry['candidates']]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if self._is_expired(created, now):
+                entry_file.unlink()
+                continue
+            loaded.append((created, key, thumb, candidates))
+
+        # Oldest first so the most recent entries end up at the MRU end
+        loaded.sort(key=lambda item: item[:2])
+        for created, key, thumb, candidates in loaded[-self.max_entries:]:
+            self._entries[key] = (created, thumb, candidates)
+        for created, key, _, _ in loaded[:-self.max_entries]:
+            self._entry_path(key).unlink()
@@ -1,7 +1,11 @@
 import datetime
+import time
+from dataclasses import replace
 from typing import Dict, List, Any, Tuple
 import json
 
+from utils.slot import Reservation, Slot, VehicleType, to_rupees, to_timestamp
+
 class ParkingLogic:
     def __init__(self):
         self.base_rates = {
@@ -18,18 +22,18 @@ class ParkingLogic:
         
         self.night_rate = 100
     
-    def get_parking_stats(self, parking_data: List[Dict]) -> Dict[str, Any]:
+    def get_parking_stats(self, parking_data: List[Slot]) -> Dict[str, Any]:
         """Calculate parking statistics"""
-        available = sum(1 for slot in parking_data if slot['vehicleType'] is None and not slot['isReserved'])
-        occupied = sum(1 for slot in parking_data if slot['vehicleType'] is not None)
-        reserved = sum(1 for slot in parking_data if slot['isReserved'])
-        total_revenue = sum(slot['charge'] for slot in parking_data if slot['charge'])
+        available = sum(1 for slot in parking_data if slot.is_available)
+        occupied = sum(1 for slot in parking_data if slot.is_occupied)
+        reserved = sum(1 for slot in parking_data if slot.is_reserved)
+        total_revenue = sum(slot.charge for slot in parking_data)
         
         return {
             'available': available,
             'occupied': occupied,
             'reserved': reserved,
-            'revenue': total_revenue,
+            'revenue': to_rupees(total_revenue),
             'total': len(parking_data)
         }
     
@@ -78,39 +82,40 @@ class ParkingLogic:
             'nightRate': is_night
         }
     
-    def park_vehicle(self, parking_data: List[Dict], vehicle_type: str, vehicle_number: str, duration: int) -> Dict[str, Any]:
+    def park_vehicle(self, parking_data: List[Slot], vehicle_type: str, vehicle_number: str, duration: int) -> Dict[str, Any]:
         """Park a vehicle in the first available slot"""
+        try:
+            kind = VehicleType.from_label(vehicle_type)
+        except KeyError:
+            return {
+                'success': False,
+                'message': f'Unknown vehicle type: {vehicle_type}'
+            }
+        
         # Find first available slot
-        for slot in parking_data:
-            if slot['vehicleType'] is None and not slot['isReserved']:
-                current_time = datetime.datetime.now()
-                arrival_time = current_time.strftime('%H:%M')
-                arrival_date = current_time.strftime('%d-%m-%y')
-                weekday = current_time.strftime('%a')
-                
-                # Calculate expected pickup time
-                pickup_time = current_time + datetime.timedelta(hours=duration)
-                expected_pickup_date = pickup_time.strftime('%d-%m-%y')
-                expected_pickup_time = pickup_time.strftime('%H:%M')
+        for index, slot in enumerate(parking_data):
+            if slot.is_available:
+                # Whole minutes, the resolution the data files keep
+                arrival = int(time.time()) // 60 * 60
+                arrival_time = datetime.datetime.fromtimestamp(arrival).strftime('%H:%M')
                 
                 # Calculate charge
                 charge_info = self.calculate_charge(vehicle_type, duration, arrival_time)
                 
                 # Update slot
-                slot.update({
-                    'vehicleType': vehicle_type,
-                    'vehicleNumber': vehicle_number,
-                    'arrivalDate': arrival_date,
-                    'arrivalTime': arrival_time,
-                    'expectedPickupDate': expected_pickup_date,
-                    'expectedPickupTime': expected_pickup_time,
-                    'weekday': weekday,
-                    'charge': charge_info['total']
-                })
+                parking_data[index] = replace(
+                    slot,
+                    vehicle_type=kind,
+                    vehicle_number=vehicle_number,
+                    arrival=arrival,
+                    expected_pickup=arrival + duration * 3600,
+                    charge=charge_info['total'] * 100,
+                    weekday=datetime.datetime.fromtimestamp(arrival).strftime('%a')
+                )
                 
                 return {
                     'success': True,
-                    'slot': slot['slot'],
+                    'slot': slot.slot,
                     'data': parking_data,
                     'charge': charge_info
                 }
@@ -120,11 +125,11 @@ class ParkingLogic:
             'message': 'No available slots'
         }
     
-    def remove_vehicle(self, parking_data: List[Dict], slot_number: int) -> Dict[str, Any]:
+    def remove_vehicle(self, parking_data: List[Slot], slot_number: int) -> Dict[str, Any]:
         """Remove vehicle from slot and generate bill"""
         slot = parking_data[slot_number - 1]
         
-        if slot['vehicleType'] is None:
+        if slot.vehicle_type is None:
             return {
                 'success': False,
                 'message': 'Slot is already empty'
@@ -133,29 +138,20 @@ class ParkingLogic:
         # Generate bill
         bill = {
             'slot': slot_number,
-            'vehicleType': slot['vehicleType'],
-            'vehicleNumber': slot['vehicleNumber'],
-            'arrivalDate': slot['arrivalDate'],
-            'arrivalTime': slot['arrivalTime'],
+            'vehicleType': slot.vehicle_type.label,
+            'vehicleNumber': slot.vehicle_number,
+            'arrivalDate': slot.arrival_date,
+            'arrivalTime': slot.arrival_time,
             'departureDate': datetime.datetime.now().strftime('%d-%m-%y'),
             'departureTime': datetime.datetime.now().strftime('%H:%M'),
-            'duration': self._calculate_actual_duration(slot['arrivalDate'], slot['arrivalTime']),
+            'duration': self._calculate_actual_duration(slot.arrival),
             'baseRate': self._get_base_rate_from_charge(slot),
             'surcharge': self._get_surcharge_from_charge(slot),
-            'total': slot['charge']
+            'total': slot.charge_rupees
         }
         
-        # Clear slot
-        slot.update({
-            'vehicleType': None,
-            'vehicleNumber': None,
-            'arrivalDate': None,
-            'arrivalTime': None,
-            'expectedPickupDate': None,
-            'expectedPickupTime': None,
-            'weekday': None,
-            'charge': 0
-        })
+        # Clear slot, a reservation on it is kept
+        parking_data[slot_number - 1] = Slot(slot=slot.slot, reservation=slot.reservation)
         
         return {
             'success': True,
@@ -163,26 +159,30 @@ class ParkingLogic:
             'bill': bill
         }
     
-    def reserve_slot(self, parking_data: List[Dict], customer_name: str, vehicle_type: str, 
+    def reserve_slot(self, parking_data: List[Slot], customer_name: str, vehicle_type: str, 
                     vehicle_number: str, date: str, time: str, duration: int) -> Dict[str, Any]:
         """Reserve the first available slot"""
-        for slot in parking_data:
-            if slot['vehicleType'] is None and not slot['isReserved']:
-                slot.update({
-                    'isReserved': True,
-                    'reservationData': {
-                        'customerName': customer_name,
-                        'vehicleType': vehicle_type,
-                        'vehicleNumber': vehicle_number,
-                        'date': date,
-                        'time': time,
-                        'duration': duration
-                    }
-                })
+        try:
+            kind = VehicleType.from_label(vehicle_type)
+        except KeyError:
+            return {
+                'success': False,
+                'message': f'Unknown vehicle type: {vehicle_type}'
+            }
+        
+        for index, slot in enumerate(parking_data):
+            if slot.is_available:
+                parking_data[index] = replace(slot, reservation=Reservation(
+                    customer_name=customer_name,
+                    vehicle_type=kind,
+                    vehicle_number=vehicle_number,
+                    arrival=to_timestamp(date, time),
+                    duration=duration
+                ))
                 
                 return {
                     'success': True,
-                    'slot': slot['slot'],
+                    'slot': slot.slot,
                     'data': parking_data
                 }
         
@@ -191,22 +191,18 @@ class ParkingLogic:
             'message': 'No available slots for reservation'
         }
     
-    def _calculate_actual_duration(self, arrival_date: str, arrival_time: str) -> int:
+    def _calculate_actual_duration(self, arrival: int) -> int:
         """Calculate actual parking duration"""
-        try:
-            arrival_datetime = datetime.datetime.strptime(f"{arrival_date} {arrival_time}", '%d-%m-%y %H:%M')
-            current_datetime = datetime.datetime.now()
-            duration = (current_datetime - arrival_datetime).total_seconds() / 3600
-            return max(1, int(duration))
-        except:
+        if arrival is None:
             return 1
+        duration = (time.time() - arrival) / 3600
+        return max(1, int(duration))
     
-    def _get_base_rate_from_charge(self, slot: Dict) -> int:
+    def _get_base_rate_from_charge(self, slot: Slot) -> int:
         """Extract base rate from slot data"""
-        vehicle_type = slot['vehicleType']
-        return self.base_rates.get(vehicle_type, 150)
+        return self.base_rates.get(slot.vehicle_type.label, 150)
     
-    def _get_surcharge_from_charge(self, slot: Dict) -> int:
+    def _get_surcharge_from_charge(self, slot: Slot) -> int:
         """Calculate surcharge from slot data"""
         # This is a simplified calculation
         # In a real implementation, you'd store more detailed pricing info
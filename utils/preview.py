@@ -0,0 +1,56 @@
+import threading
+import time
+from typing import Iterator
+
+import cv2
+import numpy as np
+
+
+class PreviewBroadcaster:
+    """Publishes annotated detection frames as an MJPEG stream at a throttled rate.
+
+    Detection loops ask ``wants_frame()`` before drawing overlays, so frames are
+    only annotated and encoded when a viewer is connected and the next preview
+    frame is due.
+    """
+
+    def __init__(self, fps: float = 5, jpeg_quality: int = 70):
+        self.interval = 1.0 / fps if fps > 0 else 0
+        self.jpeg_quality = jpeg_quality
+        self._condition = threading.Condition()
+        self._jpeg = None
+        self._sequence = 0
+        self._last_publish = 0.0
+        self._viewers = 0
+
+    def wants_frame(self) -> bool:
+        return self._viewers > 0 and time.monotonic() - self._last_publish >= self.interval
+
+    def publish(self, frame: np.ndarray) -> None:
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+        with self._condition:
+            self._jpeg = buffer.tobytes()
+            self._sequence += 1
+            self._last_publish = time.monotonic()
+            self._condition.notify_all()
+
+    def stream(self, timeout: float = 10.0) -> Iterator[bytes]:
+        """Yield multipart/x-mixed-replace chunks until the viewer disconnects"""
+        with self._condition:
+            self._viewers += 1
+        last_sequence = 0
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._sequence != last_sequence, timeout=timeout)
+                    if self._sequence == last_sequence:
+                        continue
+                    last_sequence = self._sequence
+                    jpeg = self._jpeg
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+        finally:
+            with self._condition:
+                self._viewers -= 1
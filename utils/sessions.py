@@ -0,0 +1,184 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.state_store import StateStore
+
+
+def empty_results() -> Dict[str, Any]:
+    return {
+        'vehicle_type': None,
+        'vehicle_bbox': None,
+        'license_plate': None,
+        'parking_hours': None
+    }
+
+
+class DetectionSession:
+    """State of one vehicle going through the detection pipeline on one camera.
+
+    Status and results live in a StateStore, so the detection worker and the
+    HTTP handlers can read and write them from different threads.
+    """
+
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    def __init__(self, camera_source):
+        self.id = uuid.uuid4().hex[:12]
+        self.camera_source = camera_source
+        self.created = time.time()
+        self.store = StateStore({
+            'status': {
+                'status': 'queued',  # queued, running, completed, error, cancelled
+                'current_phase': None,
+                'message': None
+            },
+            'results': empty_results()
+        })
+        self._cancel_event = threading.Event()
+
+    def update_status(self, **fields) -> None:
+        """Update the status, ignored once the session has been cancelled"""
+        def apply(state):
+            if state['status']['status'] == 'cancelled':
+                return False
+            state['status'].update(fields)
+        self.store.modify(apply)
+
+    def set_result(self, key: str, value: Any) -> None:
+        self.store.update('results', {key: value})
+
+    def cancel(self) -> None:
+        """Ask the pipeline to stop at the next frame"""
+        self._cancel_event.set()
+
+        def apply(state):
+            if state['status']['status'] not in self.ACTIVE_STATUSES:
+                return False
+            state['status'].update(status='cancelled', current_phase=None, message='Detection cancelled')
+        self.store.modify(apply)
+
+    @property
+    def status(self) -> Dict[str, Any]:
+        return self.store.get('status')
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        return self.store.get('results')
+
+    @property
+    def version(self) -> int:
+        return self.store.version
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def is_active(self) -> bool:
+        return self.store.get('status', 'status') in self.ACTIVE_STATUSES
+
+    def to_dict(self, snapshot: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """JSON view of the session, built from one consistent snapshot"""
+        snapshot = snapshot or self.store.snapshot()
+        status = snapshot['status']
+        return {
+            'session_id': self.id,
+            'camera': str(self.camera_source),
+            'version': snapshot['version'],
+            'status': status['status'],
+            'current_phase': status.get('current_phase'),
+            'message': status.get('message'),
+            'results': snapshot['results']
+        }
+
+
+class SessionManager:
+    """Runs detection sessions on a bounded pool of worker threads.
+
+    Each camera runs at most one session at a time. Sessions beyond the worker
+    count wait in the pool queue with status ``queued``, up to ``max_queued``.
+    Finished sessions are kept for ``max_finished`` lookups of their results.
+    latest() is the most recently started session until that session is reset,
+    then None until the next start, so id-less clients see idle after a reset.
+    """
+
+    def __init__(self, runner: Callable[[DetectionSession], None], max_workers: int = 2,
+                 max_queued: int = 4, max_finished: int = 50):
+        self._runner = runner
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='detection')
+        self._sessions = OrderedDict()
+        self._latest_id: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def start(self, camera_source) -> Tuple[Optional[DetectionSession], str]:
+        """Start a session on a camera.
+
+        Returns the session and ``started``, or the session already running on
+        that camera and ``already_running``, or None and ``busy`` when the queue is full.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                if session.is_active and session.camera_source == camera_source:
+                    return session, 'already_running'
+
+            if self._active_count() >= self.max_workers + self.max_queued:
+                return None, 'busy'
+
+            session = DetectionSession(camera_source)
+            self._sessions[session.id] = session
+            self._latest_id = session.id
+            self._prune()
+
+        self._executor.submit(self._run, session)
+        return session, 'started'
+
+    def _run(self, session: DetectionSession) -> None:
+        if session.cancelled:
+            return
+        self._runner(session)
+
+    def get(self, session_id: str) -> Optional[DetectionSession]:
+        return self._sessions.get(session_id)
+
+    def latest(self) -> Optional[DetectionSession]:
+        with self._lock:
+            return self._sessions.get(self._latest_id) if self._latest_id is not None else None
+
+    def reset(self, session_id: str) -> Optional[DetectionSession]:
+        """Cancel a session and forget it"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session_id == self._latest_id:
+                self._latest_id = None
+        if session is not None:
+            session.cancel()
+        return session
+
+    def sessions(self) -> List[DetectionSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def active_count(self) -> int:
+        with self._lock:
+            return self._active_count()
+
+    def shutdown(self) -> None:
+        """Cancel every session and wait for the workers to finish"""
+        for session in self.sessions():
+            session.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _active_count(self) -> int:
+        return sum(1 for session in self._sessions.values() if session.is_active)
+
+    def _prune(self) -> None:
+        finished = [sid for sid, session in self._sessions.items() if not session.is_active]
+        for session_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._sessions[session_id]
@@ -0,0 +1,215 @@
+import datetime
+import logging
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%d-%m-%y'
+TIME_FORMAT = '%H:%M'
+
+
+class VehicleType(IntEnum):
+    BIKE = 1
+    CAR = 2
+    TRUCK = 3
+
+    @property
+    def label(self) -> str:
+        return self.name.title()
+
+    @classmethod
+    def from_label(cls, label: str) -> 'VehicleType':
+        """'Bike', 'Car' or 'Truck' as stored in the data files, raises KeyError otherwise"""
+        return cls[str(label).upper()]
+
+    def __str__(self) -> str:
+        return self.label
+
+
+def to_timestamp(date: Optional[str], time_str: Optional[str]) -> Optional[int]:
+    """Epoch seconds of a dd-mm-yy date and HH:MM local time, None when missing or malformed"""
+    if not date or not time_str:
+        return None
+    try:
+        return int(datetime.datetime.strptime(f"{date} {time_str}", f"{DATE_FORMAT} {TIME_FORMAT}").timestamp())
+    except ValueError:
+        return None
+
+
+def _read_timestamp(data: Dict[str, Any], date_key: str, time_key: str) -> Optional[int]:
+    """Like to_timestamp, but a date or time that is present and cannot be read raises ValueError"""
+    timestamp = to_timestamp(data.get(date_key), data.get(time_key))
+    if timestamp is None and (data.get(date_key) or data.get(time_key)):
+        raise ValueError(f"unreadable {date_key}/{time_key}: {data.get(date_key)!r} {data.get(time_key)!r}")
+    return timestamp
+
+
+def format_date(timestamp: Optional[int]) -> Optional[str]:
+    return datetime.datetime.fromtimestamp(timestamp).strftime(DATE_FORMAT) if timestamp is not None else None
+
+
+def format_time(timestamp: Optional[int]) -> Optional[str]:
+    return datetime.datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT) if timestamp is not None else None
+
+
+def to_paise(rupees: Any) -> int:
+    return round(float(rupees or 0) * 100)
+
+
+def to_rupees(paise: int):
+    """Whole rupees stay ints so the stored JSON looks the way it always has"""
+    return paise // 100 if paise % 100 == 0 else paise / 100
+
+
+@dataclass(frozen=True, slots=True)
+class Reservation:
+    customer_name: str
+    vehicle_type: VehicleType
+    vehicle_number: str
+    arrival: Optional[int]
+    duration: int
+
+    @property
+    def date(self) -> Optional[str]:
+        return format_date(self.arrival)
+
+    @property
+    def time(self) -> Optional[str]:
+        return format_time(self.arrival)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Reservation':
+        return cls(
+            customer_name=data['customerName'],
+            vehicle_type=VehicleType.from_label(data['vehicleType']),
+            vehicle_number=data['vehicleNumber'],
+            arrival=_read_timestamp(data, 'date', 'time'),
+            duration=int(data.get('duration') or 0)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'customerName': self.customer_name,
+            'vehicleType': self.vehicle_type.label,
+            'vehicleNumber': self.vehicle_number,
+            'date': self.date,
+            'time': self.time,
+            'duration': self.duration
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    """One parking slot.
+
+    Times are epoch seconds and the charge is in paise, so nothing has to be
+    parsed to compare, bill or report on a slot. Instances are immutable:
+    change a slot with ``dataclasses.replace`` and put the result back in the
+    list, which lets a whole lot be shared between sessions without copying.
+    The dd-mm-yy strings and rupee amounts of the data files only appear in
+    from_dict/to_dict and the display properties. A stored record that cannot
+    be read is kept verbatim in ``raw`` and written back unchanged; such a
+    slot is never offered for parking.
+    """
+    slot: int
+    vehicle_type: Optional[VehicleType] = None
+    vehicle_number: Optional[str] = None
+    arrival: Optional[int] = None
+    expected_pickup: Optional[int] = None
+    charge: int = 0
+    reservation: Optional[Reservation] = None
+    weekday: Optional[str] = None  # As recorded at arrival, kept rather than recomputed
+    raw: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_available(self) -> bool:
+        return self.vehicle_type is None and self.reservation is None and self.raw is None
+
+    @property
+    def is_occupied(self) -> bool:
+        return self.vehicle_type is not None
+
+    @property
+    def is_reserved(self) -> bool:
+        return self.reservation is not None
+
+    @property
+    def arrival_date(self) -> Optional[str]:
+        return format_date(self.arrival)
+
+    @property
+    def arrival_time(self) -> Optional[str]:
+        return format_time(self.arrival)
+
+    @property
+    def pickup_date(self) -> Optional[str]:
+        return format_date(self.expected_pickup)
+
+    @property
+    def pickup_time(self) -> Optional[str]:
+        return format_time(self.expected_pickup)
+
+    @property
+    def charge_rupees(self):
+        return to_rupees(self.charge)
+
+    @property
+    def vehicle_label(self) -> str:
+        if self.vehicle_type is not None:
+            return self.vehicle_type.label
+        return str((self.raw or {}).get('vehicleType') or 'Unknown')
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Slot':
+        """Read a stored record, raises KeyError, ValueError or TypeError when it cannot be read"""
+        reservation = data.get('reservationData')
+        if data.get('isReserved') and not reservation:
+            raise ValueError("isReserved without reservationData")
+        return cls(
+            slot=int(data['slot']),
+            vehicle_type=VehicleType.from_label(data['vehicleType']) if data.get('vehicleType') else None,
+            vehicle_number=data.get('vehicleNumber'),
+            arrival=_read_timestamp(data, 'arrivalDate', 'arrivalTime'),
+            expected_pickup=_read_timestamp(data, 'expectedPickupDate', 'expectedPickupTime'),
+            charge=to_paise(data.get('charge')),
+            reservation=Reservation.from_dict(reservation) if data.get('isReserved') else None,
+            weekday=data.get('weekday')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.raw is not None:
+            return dict(self.raw)
+        return {
+            'slot': self.slot,
+            'vehicleType': self.vehicle_type.label if self.vehicle_type is not None else None,
+            'vehicleNumber': self.vehicle_number,
+            'arrivalDate': self.arrival_date,
+            'arrivalTime': self.arrival_time,
+            'expectedPickupDate': self.pickup_date,
+            'expectedPickupTime': self.pickup_time,
+            'weekday': self.weekday,
+            'charge': self.charge_rupees,
+            'isReserved': self.is_reserved,
+            'reservationData': self.reservation.to_dict() if self.reservation is not None else None
+        }
+
+
+def slots_from_dicts(records: Iterable[Dict[str, Any]]) -> List[Slot]:
+    """Read stored records; one that cannot be read is logged and kept as-is, so it never blocks a load"""
+    slots = []
+    for record in records:
+        try:
+            slots.append(Slot.from_dict(record))
+        except (KeyError, ValueError, TypeError) as e:
+            if not isinstance(record, dict) or 'slot' not in record:
+                logger.error(f"Skipping parking record without a slot number: {record!r}")
+                continue
+            logger.warning(f"Keeping unreadable record for slot {record['slot']} as-is ({e!r}): {record!r}")
+            slots.append(Slot(slot=record['slot'], raw=record))
+    return slots
+
+
+def slots_to_dicts(slots: Iterable[Slot]) -> List[Dict[str, Any]]:
+    return [slot.to_dict() for slot in slots]
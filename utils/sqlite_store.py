@@ -0,0 +1,195 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.slot import to_paise, to_timestamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    slot INTEGER PRIMARY KEY,
+    vehicle_type TEXT,
+    vehicle_number TEXT,
+    arrival_date TEXT,
+    arrival_time TEXT,
+    arrival_ts INTEGER,
+    expected_pickup_date TEXT,
+    expected_pickup_time TEXT,
+    weekday TEXT,
+    charge REAL NOT NULL DEFAULT 0,
+    is_reserved INTEGER NOT NULL DEFAULT 0,
+    reservation_data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_slots_vehicle_number ON slots (vehicle_number);
+CREATE INDEX IF NOT EXISTS idx_slots_arrival_ts ON slots (arrival_ts);
+
+CREATE TABLE IF NOT EXISTS stays (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    slot INTEGER NOT NULL,
+    vehicle_type TEXT,
+    vehicle_number TEXT,
+    arrival_ts INTEGER,
+    departure_ts INTEGER NOT NULL,
+    charge INTEGER NOT NULL DEFAULT 0,
+    bill TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stays_slot ON stays (slot);
+CREATE INDEX IF NOT EXISTS idx_stays_vehicle_number ON stays (vehicle_number);
+CREATE INDEX IF NOT EXISTS idx_stays_arrival_ts ON stays (arrival_ts);
+
+CREATE TABLE IF NOT EXISTS holidays (
+    date TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    rush_from TEXT,
+    rush_to TEXT
+);
+"""
+
+# PRAGMA user_version of the current schema. 1: stays.charge holds integer paise instead of REAL rupees
+SCHEMA_VERSION = 1
+
+# Slot dict keys as used by the app and their slots table columns
+SLOT_FIELDS = (
+    ('vehicleType', 'vehicle_type'),
+    ('vehicleNumber', 'vehicle_number'),
+    ('arrivalDate', 'arrival_date'),
+    ('arrivalTime', 'arrival_time'),
+    ('expectedPickupDate', 'expected_pickup_date'),
+    ('expectedPickupTime', 'expected_pickup_time'),
+    ('weekday', 'weekday'),
+    ('charge', 'charge'),
+)
+
+
+def slot_to_row(slot: Dict[str, Any]) -> tuple:
+    values = [slot.get(key) for key, _ in SLOT_FIELDS[:-1]] + [slot.get('charge') or 0]
+    reservation = slot.get('reservationData')
+    return (
+        slot['slot'], *values,
+        to_timestamp(slot.get('arrivalDate'), slot.get('arrivalTime')),
+        int(bool(slot.get('isReserved'))),
+        json.dumps(reservation) if reservation is not None else None
+    )
+
+
+def row_to_slot(row: sqlite3.Row) -> Dict[str, Any]:
+    slot = {'slot': row['slot']}
+    for key, column in SLOT_FIELDS:
+        slot[key] = row[column]
+    slot['isReserved'] = bool(row['is_reserved'])
+    slot['reservationData'] = json.loads(row['reservation_data']) if row['reservation_data'] else None
+    return slot
+
+
+class SQLiteStore:
+    """Parking slots, completed stays and holidays in one SQLite database.
+
+    The database runs in WAL mode, so the Streamlit pages can read while a
+    save is being written. Each call opens its own short-lived connection,
+    which keeps the store safe to use from Streamlit's script threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            has_tables = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'stays'").fetchone() is not None
+            conn.executescript(SCHEMA)
+            if has_tables and version < 1:
+                conn.execute('UPDATE stays SET charge = CAST(ROUND(charge * 100) AS INTEGER)')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load_slots(self) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT slot, vehicle_type, vehicle_number, arrival_date, arrival_time, expected_pickup_date, '
+                'expected_pickup_time, weekday, charge, is_reserved, reservation_data FROM slots ORDER BY slot'
+            ).fetchall()
+        return [row_to_slot(row) for row in rows]
+
+    def save_slots(self, data: List[Dict[str, Any]]) -> None:
+        """Write the slots that changed"""
+        with self._connect() as conn:
+            current = {
+                row['slot']: row_to_slot(row) for row in conn.execute(
+                    'SELECT slot, vehicle_type, vehicle_number, arrival_date, arrival_time, expected_pickup_date, '
+                    'expected_pickup_time, weekday, charge, is_reserved, reservation_data FROM slots'
+                )
+            }
+            self._write_slots(conn, [slot for slot in data if current.get(slot['slot']) != slot])
+
+    def replace_slots(self, data: List[Dict[str, Any]]) -> None:
+        """Replace every slot, dropping slots that are not in ``data``"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM slots')
+            self._write_slots(conn, data)
+
+    @staticmethod
+    def _write_slots(conn: sqlite3.Connection, slots: List[Dict[str, Any]]) -> None:
+        conn.executemany(
+            'INSERT OR REPLACE INTO slots (slot, vehicle_type, vehicle_number, arrival_date, arrival_time, '
+            'expected_pickup_date, expected_pickup_time, weekday, charge, arrival_ts, is_reserved, '
+            'reservation_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [slot_to_row(slot) for slot in slots]
+        )
+
+    def record_stay(self, bill: Dict[str, Any]) -> None:
+        """Store the bill of a vehicle that left, as built by ParkingLogic.remove_vehicle, with the charge in paise"""
+        departure_ts = to_timestamp(bill.get('departureDate'), bill.get('departureTime')) or int(time.time())
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO stays (slot, vehicle_type, vehicle_number, arrival_ts, departure_ts, charge, bill) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (bill['slot'], bill.get('vehicleType'), bill.get('vehicleNumber'),
+                 to_timestamp(bill.get('arrivalDate'), bill.get('arrivalTime')),
+                 departure_ts, to_paise(bill.get('total')), json.dumps(bill))
+            )
+
+    def load_stays(self, vehicle_number: Optional[str] = None, since_ts: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Completed stays, newest first, optionally for one vehicle or arrivals after a timestamp.
+
+        ``charge`` is in paise, the bill keeps the rupee amounts it was shown with.
+        """
+        query = 'SELECT slot, vehicle_type, vehicle_number, arrival_ts, departure_ts, charge, bill FROM stays'
+        conditions, params = [], []
+        if vehicle_number is not None:
+            conditions.append('vehicle_number = ?')
+            params.append(vehicle_number)
+        if since_ts is not None:
+            conditions.append('arrival_ts >= ?')
+            params.append(since_ts)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        with self._connect() as conn:
+            rows = conn.execute(query + ' ORDER BY departure_ts DESC', params).fetchall()
+        # int() as well, a database created before SCHEMA_VERSION 1 keeps its REAL column
+        return [{**dict(row), 'charge': int(row['charge']), 'bill': json.loads(row['bill']) if row['bill'] else None} for row in rows]
+
+    def load_holidays(self) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute('SELECT date, name, rush_from, rush_to FROM holidays').fetchall()
+        holidays = [{'date': row['date'], 'name': row['name'], 'rushFrom': row['rush_from'], 'rushTo': row['rush_to']}
+                    for row in rows]
+        # Dates are dd-mm-yyyy, sort them chronologically
+        return sorted(holidays, key=lambda h: h['date'][6:] + h['date'][3:5] + h['date'][:2])
+
+    def save_holidays(self, holidays: List[Dict[str, Any]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO holidays (date, name, rush_from, rush_to) VALUES (?, ?, ?, ?)',
+                [(h['date'], h['name'], h.get('rushFrom'), h.get('rushTo')) for h in holidays]
+            )
@@ -0,0 +1,98 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import streamlit as st
+
+from utils.data_manager import DataManager
+from utils.slot import Slot
+
+
+class ParkingStateCache:
+    """One authoritative copy of the parking data per process.
+
+    Sessions share one tuple of the immutable slots instead of parsing the
+    data files for every browser tab. Before each read the data files are
+    stat'ed, and they are only loaded again when one of them changed on disk,
+    which covers saves made by other processes as well as journal appends and
+    SQLite writes.
+    """
+
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+        self._lock = threading.Lock()
+        self._token: Optional[Tuple] = None
+        self._view: Tuple[Slot, ...] = ()
+        self._version = 0
+
+    def _watched_files(self) -> List[Path]:
+        files = [self.data_manager.version_file, self.data_manager.parking_file]
+        if self.data_manager.journal is not None:
+            files.append(self.data_manager.journal.path)
+        if self.data_manager.store is not None:
+            db = self.data_manager.store.path
+            files += [db, db.with_name(db.name + '-wal')]
+        return files
+
+    def _stat_token(self) -> Tuple:
+        token = []
+        for path in self._watched_files():
+            try:
+                stat = os.stat(path)
+                token.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                token.append(None)
+        return tuple(token)
+
+    def _adopt(self, data: List[Slot], version: int, token: Optional[Tuple]) -> None:
+        self._view = tuple(data)
+        self._version = version
+        self._token = token
+
+    def _refresh(self) -> None:
+        # Stat before loading, so a write landing during the load only costs one extra reload
+        token = self._stat_token()
+        if token == self._token:
+            return
+        data, version = self.data_manager.load_versioned()
+        self._adopt(data, version, token)
+
+    def view(self) -> Tuple[Tuple[Slot, ...], int]:
+        """Current slots, read-only, with the version they were loaded at"""
+        with self._lock:
+            self._refresh()
+            return self._view, self._version
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def mutable_copy(self) -> Tuple[List[Slot], int]:
+        """List of the slots for a session to edit and pass back to save()"""
+        with self._lock:
+            self._refresh()
+            return list(self._view), self._version
+
+    def save(self, data: List[Slot], base_version: Optional[int] = None) -> int:
+        """Save through the data manager and adopt the result, returns the new version.
+
+        Raises SaveConflictError like DataManager.save_parking_data, which also
+        updates ``data`` in place with the merged result.
+        """
+        with self._lock:
+            version = self.data_manager.save_parking_data(data, base_version=base_version)
+            token = self._stat_token()
+            # Only trust the stat if nobody else saved after us, otherwise reload on the next read
+            if self.data_manager.current_version() != version:
+                token = None
+            self._adopt(data, version, token)
+        return version
+
+
+@st.cache_resource
+def get_state_cache() -> ParkingStateCache:
+    """The process-wide cache, shared by every page and session"""
+    return ParkingStateCache(DataManager())
@@ -0,0 +1,65 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class StateStore:
+    """Lock-protected state shared between a detection worker and HTTP readers.
+
+    Writers mutate the state under the lock and bump ``version``; readers get a
+    deep-copied snapshot, so they never see a half-applied update. Readers that
+    want to follow progress call ``wait_for_change`` instead of polling.
+    """
+
+    def __init__(self, initial: Dict[str, Any]):
+        self._state = copy.deepcopy(initial)
+        self._version = 0
+        self._condition = threading.Condition()
+
+    @property
+    def version(self) -> int:
+        with self._condition:
+            return self._version
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the current state, with its version under ``version``"""
+        with self._condition:
+            return self._snapshot()
+
+    def get(self, section: str, key: Optional[str] = None) -> Any:
+        with self._condition:
+            value = self._state[section] if key is None else self._state[section].get(key)
+            return copy.deepcopy(value)
+
+    def update(self, section: str, fields: Dict[str, Any]) -> int:
+        """Merge fields into one section of the state, returns the new version"""
+        return self.modify(lambda state: state[section].update(fields))
+
+    def modify(self, mutate: Callable[[Dict[str, Any]], Optional[bool]]) -> int:
+        """Apply ``mutate`` to the state under the lock.
+
+        ``mutate`` may return False to signal that it changed nothing, in which
+        case the version stays the same and waiting readers are not woken.
+        """
+        with self._condition:
+            if mutate(self._state) is not False:
+                self._version += 1
+                self._condition.notify_all()
+            return self._version
+
+    def wait_for_change(self, since_version: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until the version moves past ``since_version``, returns the new snapshot or None on timeout"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._version != since_version, timeout=timeout):
+                return None
+            return self._snapshot()
+
+    def notify_all(self) -> None:
+        """Wake waiting readers without changing the state, e.g. on shutdown"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        snapshot = copy.deepcopy(self._state)
+        snapshot['version'] = self._version
+        return snapshot
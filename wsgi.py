@@ -0,0 +1,59 @@
+"""Production entry point for the detection server.
+
+Serves the Flask app with waitress instead of the Flask development server:
+
+    python wsgi.py
+
+The server runs as one process with a pool of request threads. Cameras,
+loaded models and detection sessions live in that process, so it must not be
+forked into several workers. Inference runs on the detection worker pool, and
+by default leaves one CPU core free so /health, /get_results and /events keep
+answering while a detection saturates the others.
+"""
+import atexit
+import os
+import signal
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()  # Load .env first, so the default below does not shadow an INFERENCE_THREADS set there
+
+# Must be set before server.py imports the inference runtimes
+os.environ.setdefault('INFERENCE_THREADS', str(max(1, (os.cpu_count() or 2) - 1)))
+
+from waitress import serve
+
+from server import app, logger, model_registry, shutdown_server, PORT
+
+HOST = os.getenv('HOST', '127.0.0.1')
+SERVER_THREADS = int(os.getenv('SERVER_THREADS', 16))  # Request threads, each open /events or /preview stream holds one
+CONNECTION_LIMIT = int(os.getenv('CONNECTION_LIMIT', 100))
+
+
+def handle_sigterm(signum, frame):
+    # Raise SystemExit so the atexit hook below runs before the process exits
+    sys.exit(0)
+
+
+def main():
+    # Load and warm up the models before accepting requests, so the first detection does not pay for it
+    logger.info("Preloading detection models...")
+    model_registry.load_all()
+
+    atexit.register(shutdown_server)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    logger.info(f"Serving on http://{HOST}:{PORT} with {SERVER_THREADS} threads")
+    serve(
+        app,
+        host=HOST,
+        port=PORT,
+        threads=SERVER_THREADS,
+        connection_limit=CONNECTION_LIMIT,
+        send_bytes=1,  # Flush every chunk, event and MJPEG streams would otherwise sit in the output buffer
+        channel_timeout=120
+    )
+
+
+if __name__ == '__main__':
+    main()